@@ -0,0 +1,117 @@
+"""Measure the per-request overhead of access logging
+
+    python -m benchmarks.bench_access_log --requests 5000 --rounds 5
+
+Calls a one-route FastAPI app directly over ASGI in three setups: no
+access log, the old `@app.middleware("http")` logger that print()ed each
+line, and AccessLogMiddleware with its QueueListener. Output goes to
+/dev/null in both logging setups, so the numbers are the cost paid on the
+event loop, not the terminal's.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+
+from src.access_log import AccessLogMiddleware, configure_access_log
+
+
+def build_app(mode: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return PlainTextResponse("pong")
+
+    if mode == "print":
+        @app.middleware("http")
+        async def custom_logging(request: Request, call_next):
+            start_time = time.time()
+            response = await call_next(request)
+            processing_time = time.time() - start_time
+            print(
+                f"{request.client.host}:{request.client.port} - {request.method} - "
+                f"{request.url.path} - {response.status_code} completed after {processing_time}s"
+            )
+            return response
+    elif mode == "asgi":
+        app.add_middleware(AccessLogMiddleware, sample_rate=1.0)
+
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver")],
+        "client": ("127.0.0.1", 123),
+        "server": ("testserver", 80),
+    }
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+
+    for _ in range(requests):
+        done = asyncio.Event()
+        requested = False
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        await app(scope, receive, send)
+        done.set()
+
+    return time.perf_counter() - started
+
+
+async def main(args):
+    with open(os.devnull, "w") as devnull:
+        listener = configure_access_log(devnull)
+        listener.start()
+
+        apps = {mode: build_app(mode) for mode in ("none", "print", "asgi")}
+        results = {mode: float("inf") for mode in apps}
+
+        with contextlib.redirect_stdout(devnull):
+            for app in apps.values():
+                await drive(app, 500)  # warm up
+
+            # modes interleaved, best round kept, to even out machine noise
+            for _ in range(args.rounds):
+                for mode, app in apps.items():
+                    elapsed = await drive(app, args.requests) / args.requests
+                    results[mode] = min(results[mode], elapsed)
+
+        listener.stop()
+
+    base = results["none"]
+    for mode, per_request in results.items():
+        print(
+            f"{mode:>6}: {per_request * 1e6:7.1f} us/request"
+            f"  (+{(per_request - base) * 1e6:5.1f} us over no logging)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
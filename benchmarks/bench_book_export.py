@@ -0,0 +1,140 @@
+"""Measure export throughput and peak memory
+
+    python -m benchmarks.bench_book_export --rows 10000 100000
+
+Seeds a temporary database, then calls the ASGI app for
+`GET /api/{version}/books/export` directly, counting and dropping each body
+chunk (httpx's ASGITransport would buffer the whole response). As with the import benchmark,
+each size runs once for rows per second and once under tracemalloc for the
+peak Python heap, which should not grow with the row count.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import SQLModel
+
+from src import app, version_prefix
+from src.auth.dependencies import access_token_bearer, get_current_user
+from src.auth.schemas import UserPrincipalModel
+from src.config import Config
+from src.db.main import build_engine, get_session, get_session_maker
+from src.db.models import Book
+
+
+async def seed(engine, rows: int, batch: int = 10_000) -> None:
+    start = datetime(2024, 1, 1)
+
+    async with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            await conn.execute(
+                Book.__table__.insert(),
+                [
+                    {
+                        "uid": f"{i:032x}",
+                        "title": f"title {i}",
+                        "author": f"author {i % 1000}",
+                        "publisher": f"publisher {i % 50}",
+                        "published_date": start.date(),
+                        "page_count": 100 + i % 900,
+                        "language": "English",
+                        "created_at": start + timedelta(seconds=i),
+                        "update_at": start + timedelta(seconds=i),
+                    }
+                    for i in range(offset, min(rows, offset + batch))
+                ],
+            )
+
+
+async def run(rows: int, fmt: str, compress: bool, trace: bool) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'export.db')}", Config)
+
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+        await seed(engine, rows)
+
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+        async def session():
+            async with session_maker() as s:
+                yield s
+
+        principal = UserPrincipalModel(uid="bench", email="bench@example.com", role="user", is_verified=True)
+        app.dependency_overrides[get_current_user] = lambda: principal
+        app.dependency_overrides[access_token_bearer] = lambda: {"user": {"user_uid": None}}
+        app.dependency_overrides[get_session] = session
+        app.dependency_overrides[get_session_maker] = lambda: session_maker
+
+        if trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+        size = 0
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"{version_prefix}/books/export",
+            "raw_path": f"{version_prefix}/books/export".encode(),
+            "query_string": f"format={fmt}&gzip={str(compress).lower()}".encode(),
+            "headers": [(b"host", b"testserver")],
+            "client": ("127.0.0.1", 123),
+            "server": ("testserver", 80),
+        }
+
+        requested = False
+        done = asyncio.Event()
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            nonlocal size
+            if message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+
+        await app(scope, receive, send)
+        done.set()
+
+        elapsed = time.perf_counter() - started
+        label = f"{fmt}{'+gzip' if compress else ''}"
+
+        if trace:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{label:>11} {rows:>9} rows: peak heap {peak / 2**20:6.1f} MiB")
+        else:
+            print(
+                f"{label:>11} {rows:>9} rows: {rows / elapsed:9.0f} rows/s"
+                f"  ({size / 2**20:.1f} MiB sent)"
+            )
+
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+
+async def main(args):
+    for rows in args.rows:
+        await run(rows, args.format, args.gzip, trace=False)
+        await run(rows, args.format, args.gzip, trace=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--gzip", action="store_true")
+    asyncio.run(main(parser.parse_args()))
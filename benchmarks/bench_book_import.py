@@ -0,0 +1,120 @@
+"""Measure bulk import throughput and peak memory
+
+    python -m benchmarks.bench_book_import --rows 10000 100000
+
+Streams generated NDJSON (or CSV) books to `POST /api/{version}/books/import`
+through an ASGI transport, never holding the whole body in memory. Each
+size runs twice: once for rows per second, and once under tracemalloc
+(which slows everything down) for the peak Python heap. The peak should
+stay flat as the row count grows.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import SQLModel
+
+from src import app, version_prefix
+from src.auth.dependencies import access_token_bearer, get_current_user
+from src.auth.schemas import UserPrincipalModel
+from src.config import Config
+from src.db.main import build_engine
+from src.db.writer import write_queue
+
+FIELDS = ("title", "author", "publisher", "published_date", "page_count", "language")
+
+
+def book(i: int) -> dict:
+    return {
+        "title": f"title {i}",
+        "author": f"author {i % 1000}",
+        "publisher": f"publisher {i % 50}",
+        "published_date": f"{1950 + i % 70}-01-01",
+        "page_count": 100 + i % 900,
+        "language": "English",
+    }
+
+
+async def ndjson_body(rows: int, batch: int = 1000):
+    for start in range(0, rows, batch):
+        lines = (json.dumps(book(i)) for i in range(start, min(rows, start + batch)))
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def csv_body(rows: int, batch: int = 1000):
+    yield (",".join(FIELDS) + "\n").encode()
+    for start in range(0, rows, batch):
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerows(
+            [book(i)[f] for f in FIELDS] for i in range(start, min(rows, start + batch))
+        )
+        yield out.getvalue().encode()
+
+
+async def run(rows: int, fmt: str, trace: bool) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'import.db')}", Config)
+
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+        write_queue.session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        principal = UserPrincipalModel(uid="bench", email="bench@example.com", role="user", is_verified=True)
+        app.dependency_overrides[get_current_user] = lambda: principal
+        app.dependency_overrides[access_token_bearer] = lambda: {"user": {"user_uid": None}}
+
+        body = ndjson_body(rows) if fmt == "ndjson" else csv_body(rows)
+        content_type = "application/x-ndjson" if fmt == "ndjson" else "text/csv"
+
+        if trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://testserver", timeout=None
+        ) as client:
+            response = await client.post(
+                f"{version_prefix}/books/import",
+                content=body,
+                headers={"Content-Type": content_type},
+            )
+
+        elapsed = time.perf_counter() - started
+        report = response.json()
+
+        if trace:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{fmt:>6} {rows:>9} rows: peak heap {peak / 2**20:6.1f} MiB")
+        else:
+            print(
+                f"{fmt:>6} {rows:>9} rows: {report['imported'] / elapsed:9.0f} rows/s"
+                f"  ({report['failed']} failed)"
+            )
+
+        await write_queue.close()
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+
+async def main(args):
+    for rows in args.rows:
+        await run(rows, args.format, trace=False)
+        await run(rows, args.format, trace=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    asyncio.run(main(parser.parse_args()))
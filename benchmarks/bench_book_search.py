@@ -0,0 +1,138 @@
+"""Compare FTS5 book search against a LIKE '%q%' scan
+
+    python -m benchmarks.bench_book_search --rows 1000000
+
+Seeds a file database with generated books (the FTS index is filled by the
+insert trigger), then times the first page of `BookService.search_books`
+against the equivalent LIKE filter over title, author and publisher.
+Each title has one common word (in ~3% of books) and two rare ones.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import date, datetime
+from itertools import product
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import SQLModel
+
+from src.books.service import BookService
+from src.config import Config
+from src.db.main import build_engine
+from src.db.models import Book
+
+WORDS = (
+    "shadow river empire garden winter silent iron glass crown storm night "
+    "harvest ember forest ocean letters stranger kingdom voyage machine "
+    "orchard lantern mirror violet thunder desert hollow northern secret"
+).split()
+# a thousand rarer made-up words, each in roughly 0.2% of titles
+RARE_WORDS = ["".join(p) for p in product("ka lo mi ne ru ta shi vo za pe".split(), repeat=3)]
+NAMES = "Adams Baker Chen Diaz Evans Fischer Garcia Hughes Ito Jones Kim Lopez".split()
+PUBLISHERS = "Penguin Vintage Harper Orbit Tor Faber Picador Knopf".split()
+
+QUERIES = ["storm", "silent garden", "chen", "kalomi", "kalomi shivoza", "storm rutape", "xylophone"]
+
+
+def rows(start: int, count: int, rng: random.Random):
+    now = datetime.now()
+    for i in range(start, start + count):
+        yield {
+            "uid": str(uuid.uuid4()),
+            "title": " ".join([rng.choice(WORDS), *rng.sample(RARE_WORDS, 2)]),
+            "author": f"{rng.choice(NAMES)} {rng.choice(NAMES)}",
+            "publisher": rng.choice(PUBLISHERS),
+            "published_date": date(1950 + i % 70, 1, 1),
+            "page_count": 100 + i % 900,
+            "language": "English",
+            "created_at": now,
+            "update_at": now,
+        }
+
+
+async def seed(engine, count: int, chunk: int = 20_000) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    rng = random.Random(1337)
+    started = time.perf_counter()
+
+    for start in range(0, count, chunk):
+        async with engine.begin() as conn:
+            await conn.execute(
+                Book.__table__.insert(), list(rows(start, min(chunk, count - start), rng))
+            )
+
+    print(f"seeded {count} books in {time.perf_counter() - started:.1f}s")
+
+
+async def like_search(session, q: str, limit: int):
+    pattern = f"%{q}%"
+    statement = (
+        select(Book)
+        .where(
+            or_(
+                Book.title.like(pattern),
+                Book.author.like(pattern),
+                Book.publisher.like(pattern),
+            )
+        )
+        .order_by(Book.created_at.desc(), Book.uid.desc())
+        .limit(limit)
+    )
+    return (await session.execute(statement)).scalars().all()
+
+
+async def timed(func, repeat: int) -> tuple[float, int]:
+    samples, found = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = len(await func())
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, found
+
+
+async def main(args):
+    book_service = BookService()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'search.db')}"
+        engine = build_engine(url, Config)
+        await seed(engine, args.rows)
+
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        print(f"{'query':>16} {'fts ms':>9} {'like ms':>9} {'speed-up':>9}")
+
+        async with session_factory() as session:
+            for q in QUERIES:
+
+                async def fts():
+                    page = await book_service.search_books(q, session, limit=args.limit)
+                    return page["items"]
+
+                fts_ms, fts_found = await timed(fts, args.repeat)
+                like_ms, like_found = await timed(
+                    lambda: like_search(session, q, args.limit), args.repeat
+                )
+
+                print(
+                    f"{q:>16} {fts_ms:9.2f} {like_ms:9.2f} {like_ms / fts_ms:8.1f}x"
+                    f"  ({fts_found}/{like_found} rows)"
+                )
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
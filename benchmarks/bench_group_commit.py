@@ -0,0 +1,154 @@
+"""Compare insert throughput with and without group commit
+
+    python -m benchmarks.bench_group_commit --requests 1000 --concurrency 64
+
+Drives `POST /api/{version}/books/` and `POST /api/{version}/reviews/book/{book_uid}`
+in process through an ASGI transport. Authentication is overridden, so
+only routing, validation and the write path are measured. Every review is
+posted by a distinct user, so none hit the one-review-per-book check.
+With WAL and `synchronous=NORMAL` commits do not fsync, so the gap is
+widest under `--synchronous FULL`.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date
+
+from fastapi import Request
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel import SQLModel
+
+from src import app, version_prefix
+from src.auth.dependencies import access_token_bearer, get_current_user
+from src.auth.schemas import UserPrincipalModel
+from src.config import Config
+from src.db.main import build_engine, get_session
+from src.db.models import Book, User
+from src.db.writer import write_queue
+
+BOOK = {
+    "title": "title",
+    "author": "author",
+    "publisher": "publisher",
+    "published_date": "2024-01-01",
+    "page_count": 100,
+    "language": "English",
+}
+
+
+async def seed(engine, users: int) -> tuple[str, list[UserPrincipalModel]]:
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    book = Book(**{**BOOK, "published_date": date(2024, 1, 1)})
+    principals = [
+        User(
+            username=f"user{i}",
+            email=f"user{i}@example.com",
+            first_name="first",
+            last_name="last",
+            password_hash="x",
+            role="user",
+            is_verified=True,
+        )
+        for i in range(users)
+    ]
+
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        session.add(book)
+        session.add_all(principals)
+        await session.commit()
+
+    return book.uid, [
+        UserPrincipalModel(uid=u.uid, email=u.email, role=u.role, is_verified=True)
+        for u in principals
+    ]
+
+
+async def run(label: str, group_commit: bool, args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        settings = Config.model_copy(update={"SQLITE_SYNCHRONOUS": args.synchronous})
+        writer = build_engine(url, settings)
+        reader = build_engine(url, settings, read_only=True)
+        read_factory = async_sessionmaker(reader, expire_on_commit=False)
+
+        book_uid, principals = await seed(writer, args.requests)
+
+        write_queue.session_factory = async_sessionmaker(writer, expire_on_commit=False)
+        write_queue.group_commit = group_commit
+
+        async def read_session():
+            async with read_factory() as session:
+                yield session
+
+        async def current_user(request: Request):
+            return principals[int(request.headers.get("x-user", 0))]
+
+        app.dependency_overrides[get_session] = read_session
+        app.dependency_overrides[get_current_user] = current_user
+        app.dependency_overrides[access_token_bearer] = lambda: {
+            "user": {"email": principals[0].email, "user_uid": principals[0].uid}
+        }
+
+        slots = asyncio.Semaphore(args.concurrency)
+        transport = ASGITransport(app=app)
+
+        async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+
+            async def post(path, body, user=0):
+                async with slots:
+                    response = await client.post(
+                        f"{version_prefix}{path}", json=body, headers={"x-user": str(user)}
+                    )
+                    return response.status_code
+
+            for name, requests in (
+                ("books", [post("/books/", BOOK) for _ in range(args.requests)]),
+                (
+                    "reviews",
+                    [
+                        post(
+                            f"/reviews/book/{book_uid}",
+                            {"rating": 5, "review_text": "good"},
+                            user=i,
+                        )
+                        for i in range(args.requests)
+                    ],
+                ),
+            ):
+                started = time.perf_counter()
+                codes = await asyncio.gather(*requests)
+                elapsed = time.perf_counter() - started
+                failed = sum(code >= 400 for code in codes)
+
+                print(
+                    f"{label:>12} {name:>8}: {args.requests / elapsed:9.1f} req/s"
+                    f"  ({elapsed:.2f}s, {failed} failed)"
+                )
+
+        await write_queue.close()
+        app.dependency_overrides.clear()
+        await reader.dispose()
+        await writer.dispose()
+
+
+async def main(args):
+    write_queue.batch_window = args.window_ms / 1000
+    write_queue.batch_max = args.batch_max
+
+    await run("per-request", False, args)
+    await run("group", True, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--window-ms", type=float, default=Config.WRITE_BATCH_WINDOW_MS)
+    parser.add_argument("--synchronous", default=Config.SQLITE_SYNCHRONOUS)
+    parser.add_argument("--batch-max", type=int, default=Config.WRITE_BATCH_MAX)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,87 @@
+"""Compare the per-item cost of FastAPI's response serialization and ours
+
+    python -m benchmarks.bench_serialization --items 100 1000 10000
+
+Serializes a list of in-memory Book ORM objects as `List[Book]` twice:
+through FastAPI's own path (response_model validation, jsonable_encoder,
+JSONResponse) and through `src.serialization.json_response`. No database
+is involved, so the numbers are serialization alone.
+"""
+import argparse
+import asyncio
+import time
+from datetime import date, datetime
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from src.books.schemas import Book as BookSchema
+from src.db.models import Book
+from src.serialization import json_response
+
+
+def books(count: int) -> list:
+    now = datetime(2024, 1, 1, 12, 30)
+    return [
+        Book(
+            uid=f"{i:032x}",
+            title=f"title {i}",
+            author=f"author {i % 1000}",
+            publisher=f"publisher {i % 50}",
+            published_date=date(2000, 1, 1),
+            page_count=100 + i % 900,
+            language="English",
+            review_count=3,
+            rating_sum=12,
+            rating_4=3,
+            rating_avg=4.0,
+            created_at=now,
+            update_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+async def fastapi_body(field, rows) -> bytes:
+    content = await serialize_response(field=field, response_content=rows)
+    return JSONResponse(content).body
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(args):
+    field = create_model_field(name="Response", type_=List[BookSchema], mode="serialization")
+    loop = asyncio.new_event_loop()
+
+    for count in args.items:
+        rows = books(count)
+        # both paths must produce the same bytes
+        assert loop.run_until_complete(fastapi_body(field, rows)) == (
+            json_response(List[BookSchema], rows).body
+        )
+
+        before = timed(lambda: loop.run_until_complete(fastapi_body(field, rows)), args.repeat)
+        after = timed(lambda: json_response(List[BookSchema], rows), args.repeat)
+
+        print(
+            f"{count:>7} items: fastapi {before / count * 1e6:6.2f} us/item"
+            f"  fast path {after / count * 1e6:6.2f} us/item  ({before / after:.1f}x)"
+        )
+
+    loop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 10_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,148 @@
+"""Compare request throughput under the old and the tuned SQLite profiles
+
+    python -m benchmarks.bench_sqlite_profile --requests 2000 --concurrency 32
+
+The old profile is what src/db/main.py used to do: echo=True, default
+journal/synchronous settings, NullPool and a new session factory per
+request. The new profile is `build_engine` configured from Settings, with
+reads on the read-only pool and inserts going through the write queue.
+Each simulated request either reads a page of books or inserts one.
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from src.books.schemas import BookCreateModel
+from src.config import Config
+from src.db.main import build_engine
+from src.db.models import Book
+from src.db.writer import WriteQueue
+
+
+def new_book(i: int) -> Book:
+    return Book(
+        title=f"title {i}",
+        author=f"author {i % 100}",
+        publisher=f"publisher {i % 10}",
+        published_date=date(2000 + i % 20, 1, 1),
+        page_count=100 + i % 500,
+        language="English",
+    )
+
+
+def seed_row(book: Book) -> dict:
+    # built like import_books does: only the client-supplied fields, since
+    # rating_avg is generated and the other counters have server defaults
+    now = datetime.now()
+
+    return {
+        "uid": str(uuid.uuid4()),
+        **book.model_dump(include=set(BookCreateModel.model_fields)),
+        "created_at": now,
+        "update_at": now,
+    }
+
+
+async def commit_on_session(session_factory, book: Book) -> None:
+    async with session_factory() as session:
+        session.add(book)
+        await session.commit()
+
+
+async def run_profile(name, engine, session_factory, write, args) -> float:
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            Book.__table__.insert(),
+            [seed_row(new_book(i)) for i in range(args.seed)],
+        )
+
+    rng = random.Random(1337)
+    plan = [rng.random() < args.write_ratio for _ in range(args.requests)]
+    slots = asyncio.Semaphore(args.concurrency)
+    errors = 0
+
+    async def request(i: int, is_write: bool):
+        nonlocal errors
+        async with slots:
+            try:
+                if is_write:
+                    await write(new_book(args.seed + i))
+                else:
+                    async with session_factory() as session:
+                        statement = select(Book).order_by(desc(Book.created_at)).limit(20)
+                        (await session.execute(statement)).scalars().all()
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(request(i, is_write) for i, is_write in enumerate(plan)))
+    elapsed = time.perf_counter() - started
+
+    await engine.dispose()
+
+    print(
+        f"{name:>4}: {args.requests / elapsed:9.1f} req/s"
+        f"  ({elapsed:.2f}s, {errors} errors)"
+    )
+    return elapsed
+
+
+async def main(args):
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+        old_url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'old.db')}"
+        new_url = f"sqlite+aiosqlite:///{os.path.join(tmp, 'new.db')}"
+
+        # echo=True logs to stdout; bind its handler to /dev/null so the cost
+        # of formatting every statement is measured but the terminal is not.
+        with contextlib.redirect_stdout(devnull):
+            old_engine = create_async_engine(old_url, echo=True)
+
+        class PerRequestFactory:
+            def __call__(self):
+                return async_sessionmaker(old_engine, expire_on_commit=False)()
+
+        old_factory = PerRequestFactory()
+
+        async def old_write(book):
+            await commit_on_session(old_factory, book)
+
+        new_engine = build_engine(new_url, Config)
+        read_engine = build_engine(new_url, Config, read_only=True)
+        read_factory = async_sessionmaker(read_engine, expire_on_commit=False)
+        queue = WriteQueue(async_sessionmaker(new_engine, expire_on_commit=False))
+
+        async def new_write(book):
+            async def add(session):
+                session.add(book)
+
+            await queue.submit(add)
+
+        old = await run_profile("old", old_engine, old_factory, old_write, args)
+        new = await run_profile("new", new_engine, read_factory, new_write, args)
+
+        await queue.close()
+        await read_engine.dispose()
+
+        print(f"speed-up: {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    asyncio.run(main(parser.parse_args()))
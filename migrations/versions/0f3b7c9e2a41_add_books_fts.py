@@ -0,0 +1,67 @@
+"""add books fts
+
+Revision ID: 0f3b7c9e2a41
+Revises: c5a8f3e61d92
+Create Date: 2026-10-18 19:41:06.824517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f3b7c9e2a41'
+down_revision: Union[str, None] = 'c5a8f3e61d92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE books_fts USING fts5(
+            title, author, publisher,
+            content='books', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER books_fts_ai AFTER INSERT ON books BEGIN
+            INSERT INTO books_fts(rowid, title, author, publisher)
+            VALUES (new.rowid, new.title, new.author, new.publisher);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER books_fts_ad AFTER DELETE ON books BEGIN
+            INSERT INTO books_fts(books_fts, rowid, title, author, publisher)
+            VALUES ('delete', old.rowid, old.title, old.author, old.publisher);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER books_fts_au AFTER UPDATE OF title, author, publisher ON books BEGIN
+            INSERT INTO books_fts(books_fts, rowid, title, author, publisher)
+            VALUES ('delete', old.rowid, old.title, old.author, old.publisher);
+            INSERT INTO books_fts(rowid, title, author, publisher)
+            VALUES (new.rowid, new.title, new.author, new.publisher);
+        END
+        """
+    )
+    # index the books that already exist
+    op.execute("INSERT INTO books_fts(books_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS books_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS books_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS books_fts_ai")
+    op.execute("DROP TABLE IF EXISTS books_fts")
@@ -0,0 +1,53 @@
+"""leave unrated books without average
+
+Revision ID: a7c3e5f9d2b1
+Revises: f4a9d2b6c831
+Create Date: 2026-10-19 10:42:17.804561
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e5f9d2b1'
+down_revision: Union[str, None] = 'f4a9d2b6c831'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+RATING_AVG_INDEXES = {
+    'ix_books_rating_avg_uid': ['rating_avg', 'uid'],
+    'ix_books_author_rating_avg_uid': ['author', 'rating_avg', 'uid'],
+    'ix_books_language_rating_avg_uid': ['language', 'rating_avg', 'uid'],
+    'ix_books_publisher_rating_avg_uid': ['publisher', 'rating_avg', 'uid'],
+}
+
+
+def replace_rating_avg(expression: str, nullable: bool) -> None:
+    # SQLite cannot alter a generated column, and cannot drop one that is
+    # still indexed
+    for name in RATING_AVG_INDEXES:
+        op.drop_index(name, table_name='books')
+
+    op.drop_column('books', 'rating_avg')
+    op.add_column('books', sa.Column('rating_avg', sa.FLOAT(), sa.Computed(expression), nullable=nullable))
+
+    for name, columns in RATING_AVG_INDEXES.items():
+        op.create_index(name, 'books', columns, unique=False)
+
+
+def upgrade() -> None:
+    replace_rating_avg(
+        'CASE WHEN review_count > 0 THEN rating_sum * 1.0 / review_count END', nullable=True
+    )
+
+
+def downgrade() -> None:
+    replace_rating_avg(
+        'CASE WHEN review_count > 0 THEN rating_sum * 1.0 / review_count ELSE 0 END', nullable=False
+    )
@@ -0,0 +1,58 @@
+"""make tag names unique
+
+Revision ID: d2e6f0a9b374
+Revises: 9a4c2e7f1b58
+Create Date: 2026-10-18 23:41:05.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2e6f0a9b374'
+down_revision: Union[str, None] = '9a4c2e7f1b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# the oldest tag of each name survives; its duplicates are merged into it
+KEEPERS = """
+    SELECT t.uid AS uid, (
+        SELECT k.uid FROM tags AS k
+        WHERE k.name = t.name
+        ORDER BY k.created_at, k.rowid
+        LIMIT 1
+    ) AS keeper
+    FROM tags AS t
+"""
+
+
+def upgrade() -> None:
+    op.execute(f"""
+        INSERT OR IGNORE INTO booktag (book_id, tag_id)
+        SELECT b.book_id, d.keeper
+        FROM booktag AS b JOIN ({KEEPERS}) AS d ON d.uid = b.tag_id
+        WHERE d.uid != d.keeper
+    """)
+    op.execute(f"""
+        DELETE FROM booktag WHERE tag_id IN (
+            SELECT uid FROM ({KEEPERS}) WHERE uid != keeper
+        )
+    """)
+    op.execute(f"""
+        DELETE FROM tags WHERE uid IN (
+            SELECT uid FROM ({KEEPERS}) WHERE uid != keeper
+        )
+    """)
+    op.drop_index('ix_tags_name', table_name='tags')
+    op.create_index('ix_tags_name', 'tags', ['name'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tags_name', table_name='tags')
+    op.create_index('ix_tags_name', 'tags', ['name'], unique=False)
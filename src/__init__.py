@@ -1,9 +1,17 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
+from src.auth.dependencies import RoleChecker
+from src.auth.revocation import revoked_tokens
 from src.auth.routes import auth_router
 from src.books.routes import book_router
 from src.reviews.routes import review_router
 from src.tags.routes import tags_router
+from src.bg_task import broker
+from src.db.writer import write_queue
+from .access_log import configure_access_log
 from .errors import register_all_errors
+from .metrics import register_metrics
 from .middleware import register_middleware
 
 
@@ -21,6 +29,20 @@ This REST API is able to;
 
 version_prefix =f"/api/{version}"
 
+
+@asynccontextmanager
+async def life_span(app: FastAPI):
+    access_log = configure_access_log()
+    access_log.start()
+    await revoked_tokens.start()
+
+    yield
+
+    await revoked_tokens.stop()
+    await write_queue.close()
+    access_log.stop()
+
+
 app = FastAPI(
     title="BookTracker",
     description=description,
@@ -32,13 +54,16 @@ app = FastAPI(
     },
     openapi_url=f"{version_prefix}/openapi.json",
     docs_url=f"{version_prefix}/docs",
-    redoc_url=f"{version_prefix}/redoc"
+    redoc_url=f"{version_prefix}/redoc",
+    lifespan=life_span,
 )
 
 register_all_errors(app)
 
 register_middleware(app)
 
+register_metrics(app, broker, dependencies=[Depends(RoleChecker(["admin"]))])
+
 
 app.include_router(book_router, prefix=f"{version_prefix}/books", tags=["books"])
 app.include_router(auth_router, prefix=f"{version_prefix}/auth", tags=["auth"])
@@ -0,0 +1,128 @@
+"""Structured access log written off the event loop
+
+`AccessLogMiddleware` is plain ASGI: it times each request with
+perf_counter, reads the status from `http.response.start`, and hands a
+record to a `QueueHandler`. Formatting and writing the JSON line happen on
+the `QueueListener` thread. The queue is bounded and a full queue drops
+records, so a slow stdout can never stall a request.
+
+Sampling keeps ACCESS_LOG_SAMPLE_RATE of ordinary requests; server errors
+and requests slower than ACCESS_LOG_SLOW_MS are always logged.
+"""
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from src.config import Config
+
+ACCESS_LOG_QUEUE_SIZE = 10_000
+
+access_logger = logging.getLogger("booktracker.access")
+access_logger.setLevel(logging.INFO)
+access_logger.propagate = False
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+            **getattr(record, "access", {}),
+        }
+
+        return json.dumps(entry, separators=(",", ":"))
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks and leaves formatting to the listener"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # access records carry only plain values, so they can cross threads as-is
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_access_log(stream=None) -> QueueListener:
+    """Route the access logger through a queue; the caller starts and stops the listener"""
+
+    log_queue = queue.Queue(maxsize=ACCESS_LOG_QUEUE_SIZE)
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonLinesFormatter())
+
+    access_logger.handlers = [DroppingQueueHandler(log_queue)]
+
+    return QueueListener(log_queue, output, respect_handler_level=False)
+
+
+class AccessLogMiddleware:
+    def __init__(
+        self,
+        app,
+        sample_rate: float = Config.ACCESS_LOG_SAMPLE_RATE,
+        slow_ms: float = Config.ACCESS_LOG_SLOW_MS,
+        logger: logging.Logger = access_logger,
+    ) -> None:
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.logger = logger
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        sent = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, sent
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+
+            if (
+                status_code >= 500
+                or duration_ms >= self.slow_ms
+                or random.random() < self.sample_rate
+            ) and self.logger.isEnabledFor(logging.INFO):
+                # built by hand: Logger.info() would walk this deep ASGI
+                # stack looking for the caller's file and line
+                record = logging.LogRecord(
+                    self.logger.name, logging.INFO, __file__, 0, "request", None, None
+                )
+                client = scope.get("client")
+                record.access = {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round(duration_ms, 3),
+                    "bytes": sent,
+                    "client": f"{client[0]}:{client[1]}" if client else None,
+                }
+                self.logger.handle(record)
@@ -8,9 +8,9 @@ from fastapi.security.http import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db.main import get_session
-from src.db.models import User
-from src.db.redis import token_in_logout
 
+from .revocation import revoked_tokens
+from .schemas import UserPrincipalModel
 from .service import UserService
 from .utils import decode_token
 from src.errors import (
@@ -34,7 +34,7 @@ class AccessTokenBearer(HTTPBearer):
 
         token_data = decode_token(token)
 
-        if await token_in_logout(token_data["jti"]):
+        if await revoked_tokens.is_revoked(token_data["jti"]):
             raise InvalidToken()
 
         # print(token_data)
@@ -42,17 +42,26 @@ class AccessTokenBearer(HTTPBearer):
         return token_data
 
 
+# A single shared instance: FastAPI caches a dependency per request by its
+# callable, so every router depending on this object decodes the token and
+# checks revocation once per request.
+access_token_bearer = AccessTokenBearer()
+
+
 async def get_refresh_id_from_cookie(request: Request):
     return request.cookies.get("refresh_id", None)
 
 
 async def get_current_user(
-    token_details: dict = Depends(AccessTokenBearer()),
+    token_details: dict = Depends(access_token_bearer),
     session: AsyncSession = Depends(get_session),
 ):
     user_email = token_details["user"]["email"]
 
-    user = await user_service.get_user_by_email(user_email, session)
+    user = await user_service.get_principal_by_email(user_email, session)
+
+    if user is None:
+        raise InvalidToken()
 
     return user
 
@@ -61,7 +70,9 @@ class RoleChecker:
     def __init__(self, allowed_roles: List[str]) -> None:
         self.allowed_roles = allowed_roles
 
-    def __call__(self, current_user: User = Depends(get_current_user)) -> Any:
+    def __call__(
+        self, current_user: UserPrincipalModel = Depends(get_current_user)
+    ) -> Any:
         if not current_user.is_verified:
             raise AccountNotVerified()
         if current_user.role in self.allowed_roles:
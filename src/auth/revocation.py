@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+
+from cachetools import TTLCache
+from redis.exceptions import RedisError
+
+from src.config import Config
+from src.db.redis import (
+    REVOKED_JTI_CHANNEL,
+    get_revoked_jtis,
+    subscribe_revoked_jtis,
+    token_in_logout,
+)
+
+from .utils import ACCESS_TOKEN_EXPIRY
+
+logger = logging.getLogger(__name__)
+
+RESUBSCRIBE_DELAY = 1
+MAX_RESUBSCRIBE_DELAY = 30
+
+
+class _RevokedJTIs(TTLCache):
+    """TTL cache that remembers when it last evicted a live entry for space"""
+
+    evicted_until = 0.0
+
+    def popitem(self):
+        item = super().popitem()
+        self.evicted_until = time.monotonic() + self.ttl
+        return item
+
+
+class RevokedTokenCache:
+    """Per-process view of revoked access-token JTIs
+
+    While subscribed to the revocation channel the cache holds every JTI
+    revoked in the last ACCESS_TOKEN_EXPIRY seconds, so a miss means "not
+    revoked" without asking Redis. When the subscription is down, or an
+    unexpired entry had to be evicted, misses fall back to a Redis lookup;
+    if Redis cannot answer either, `fail_open` decides whether the token is
+    accepted.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = Config.REVOCATION_CACHE_SIZE,
+        ttl: int = ACCESS_TOKEN_EXPIRY,
+        fail_open: bool = Config.REVOCATION_FAIL_OPEN,
+    ) -> None:
+        self.fail_open = fail_open
+        self.synced = False
+        self._revoked = _RevokedJTIs(maxsize=maxsize, ttl=ttl)
+        self._task: asyncio.Task | None = None
+
+    def add(self, jti: str) -> None:
+        self._revoked[jti] = True
+
+    async def is_revoked(self, jti: str) -> bool:
+        if jti in self._revoked:
+            return True
+
+        if self.synced and time.monotonic() >= self._revoked.evicted_until:
+            return False
+
+        try:
+            return bool(await token_in_logout(jti))
+
+        except RedisError as e:
+            logger.warning("Could not check token revocation: %s", e)
+            return not self.fail_open
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self) -> None:
+        delay = RESUBSCRIBE_DELAY
+
+        while True:
+            pubsub = subscribe_revoked_jtis()
+
+            try:
+                await pubsub.subscribe(REVOKED_JTI_CHANNEL)
+
+                # Subscribe before catching up so nothing published in
+                # between is lost.
+                for jti in await get_revoked_jtis():
+                    self.add(jti)
+
+                self.synced = True
+                delay = RESUBSCRIBE_DELAY
+
+                async for message in pubsub.listen():
+                    self.add(message["data"].decode("utf-8"))
+
+            except (RedisError, OSError) as e:
+                logger.warning("Revocation channel unavailable: %s", e)
+
+            finally:
+                self.synced = False
+                await pubsub.aclose()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RESUBSCRIBE_DELAY)
+
+
+revoked_tokens = RevokedTokenCache()
@@ -6,14 +6,16 @@ from fastapi.responses import JSONResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src.db.main import get_session
-from src.db.redis import add_jti_to_logout, remove_jti_from_logout, token_in_logout
+from src.db.redis import add_jti_to_logout, revoke_access_jti, rotate_refresh_id
+from src.serialization import json_response
 
 from .dependencies import (
-    AccessTokenBearer,
     RoleChecker,
+    access_token_bearer,
     get_current_user,
     get_refresh_id_from_cookie,
 )
+from .revocation import revoked_tokens
 from .schemas import (
     UserBooksModel,
     UserCreateModel,
@@ -24,8 +26,8 @@ from .schemas import (
 from .service import UserService
 from .utils import (
     create_access_token,
-    verify_password,
-    generate_passwd_hash,
+    verify_password_async,
+    generate_passwd_hash_async,
     create_url_safe_token,
     decode_url_safe_token,
     ACCESS_TOKEN_EXPIRY,
@@ -37,7 +39,6 @@ from src.bg_task import send_email
 
 auth_router = APIRouter()
 user_service = UserService()
-access_token_bearer = AccessTokenBearer()
 role_checker = RoleChecker(["admin", "user"])
 version = "1.1.1"
 
@@ -91,7 +92,7 @@ async def create_user_Account(
     if user_exists:
         raise UserAlreadyExists()
 
-    new_user = await user_service.create_user(user_data, session)
+    new_user = await user_service.create_user(user_data)
 
     token = create_url_safe_token({"email": email})
 
@@ -125,7 +126,7 @@ async def verify_user_account(token: str, session: AsyncSession = Depends(get_se
         if not user:
             raise UserNotFound()
 
-        await user_service.update_user(user, {"is_verified": True}, session)
+        await user_service.update_user(user, {"is_verified": True})
 
         return JSONResponse(
             content={"message": "Account verified successfully"},
@@ -148,7 +149,7 @@ async def login_users(
     user = await user_service.get_user_by_email(email, session)
 
     if user is not None:
-        password_valid = verify_password(password, user.password_hash)
+        password_valid = await verify_password_async(password, user.password_hash)
 
         if password_valid:
             access_token = create_access_token(
@@ -188,15 +189,24 @@ async def login_users(
 @auth_router.get("/refresh_token")
 async def get_new_access_token(refresh_id: dict = Depends(get_refresh_id_from_cookie), session: AsyncSession = Depends(get_session)):
 
-    user_email = await token_in_logout(refresh_id)
+    new_refresh_id = str(uuid.uuid4())
 
-    if not refresh_id or not user_email:
+    user_email = (
+        await rotate_refresh_id(refresh_id, new_refresh_id) if refresh_id else None
+    )
+
+    user = (
+        await user_service.get_principal_by_email(user_email, session)
+        if user_email
+        else None
+    )
+
+    if user is None:
         return JSONResponse(
             content={"detail": "Invalid refresh token !!!"},
             status_code=status.HTTP_401_UNAUTHORIZED
         )
-    
-    user = await user_service.get_user_by_email(user_email, session)
+
     access_token = create_access_token(
         user_data={
             "email": user.email,
@@ -206,9 +216,7 @@ async def get_new_access_token(refresh_id: dict = Depends(get_refresh_id_from_co
         jti=str(uuid.uuid4())
     )
 
-    await remove_jti_from_logout(refresh_id)
-    refresh_id = str(uuid.uuid4())
-    await add_jti_to_logout(refresh_id, user.email)
+    refresh_id = new_refresh_id
 
     response = JSONResponse(
                 content={
@@ -231,16 +239,20 @@ async def get_new_access_token(refresh_id: dict = Depends(get_refresh_id_from_co
 
 @auth_router.get("/me", response_model=UserBooksModel)
 async def get_current_user(
-    user=Depends(get_current_user), _: bool = Depends(role_checker)
+    user=Depends(get_current_user),
+    _: bool = Depends(role_checker),
+    session: AsyncSession = Depends(get_session),
 ):
-    return user
+    user = await user_service.get_user_profile(user.email, session)
+
+    return json_response(UserBooksModel, user)
 
 
 @auth_router.get("/logout")
 async def revoke_token(token_details: dict = Depends(access_token_bearer), refresh_id: str = Depends(get_refresh_id_from_cookie)):
 
-    await remove_jti_from_logout(refresh_id)
-    await add_jti_to_logout(token_details["jti"], "Invalid", ACCESS_TOKEN_EXPIRY)
+    await revoke_access_jti(token_details["jti"], ACCESS_TOKEN_EXPIRY, refresh_id)
+    revoked_tokens.add(token_details["jti"])
 
     response = JSONResponse(
         content={"message": "Logged Out Successfully"}, status_code=status.HTTP_200_OK
@@ -270,7 +282,7 @@ async def password_reset_request(email_data: EmailModel, passwords: PasswordRese
     
     email = email_data.email
 
-    passwd_hash = generate_passwd_hash(new_password)
+    passwd_hash = await generate_passwd_hash_async(new_password)
 
     token = create_url_safe_token({"email": email, "passwd_hash": passwd_hash})
 
@@ -308,7 +320,7 @@ async def reset_account_password(
         if not user:
             raise UserNotFound()
 
-        await user_service.update_user(user, {"password_hash": passwd_hash}, session)
+        await user_service.update_user(user, {"password_hash": passwd_hash})
 
         return JSONResponse(
             content={"message": "Password reset Successfully"},
@@ -28,6 +28,13 @@ class UserModel(BaseModel):
     update_at: datetime
 
 
+class UserPrincipalModel(BaseModel):
+    uid: str
+    email: str
+    role: str
+    is_verified: bool
+
+
 class UserBooksModel(UserModel):
     books: List[Book]
     reviews: List[ReviewModel]
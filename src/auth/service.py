@@ -1,10 +1,12 @@
-from sqlmodel import select
+from sqlmodel import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from src.db.models import User
+from src.db.writer import write_queue
 
-from .schemas import UserCreateModel
-from .utils import generate_passwd_hash
+from .schemas import UserCreateModel, UserPrincipalModel
+from .utils import generate_passwd_hash_async
 
 
 class UserService:
@@ -17,33 +19,65 @@ class UserService:
 
         return user
 
+    async def get_principal_by_email(self, email: str, session: AsyncSession):
+        """Get only the columns authorization needs for the user with `email`"""
+
+        statement = select(
+            User.uid, User.email, User.role, User.is_verified
+        ).where(User.email == email)
+
+        result = await session.execute(statement)
+
+        row = result.first()
+
+        return UserPrincipalModel(**row._mapping) if row else None
+
+    async def get_user_profile(self, email: str, session: AsyncSession):
+        """Get a user together with the books and reviews of UserBooksModel"""
+
+        statement = (
+            select(User)
+            .where(User.email == email)
+            .options(selectinload(User.books), selectinload(User.reviews))
+        )
+
+        result = await session.execute(statement)
+
+        return result.scalars().first()
+
     async def user_exists(self, email, session: AsyncSession):
         user = await self.get_user_by_email(email, session)
 
         return user is not None
 
-    async def create_user(self, user_data: UserCreateModel, session: AsyncSession):
+    async def create_user(self, user_data: UserCreateModel):
         user_data_dict = user_data.model_dump()
 
         new_user = User(**user_data_dict)
 
-        new_user.password_hash = generate_passwd_hash(user_data_dict["password"])
+        new_user.password_hash = await generate_passwd_hash_async(
+            user_data_dict["password"]
+        )
         new_user.role = "user"
 
-        session.add(new_user)
+        async def add(session: AsyncSession):
+            session.add(new_user)
 
-        await session.commit()
+            return new_user
 
-        return new_user
+        return await write_queue.submit(add)
 
 
-    async def update_user(self, user:User ,user_data: dict, session:AsyncSession):
+    async def update_user(self, user:User ,user_data: dict):
 
-        for k, v in user_data.items():
-            setattr(user, k, v)
+        async def update_(session: AsyncSession):
+            await session.execute(
+                update(User).where(User.uid == user.uid).values(**user_data)
+            )
 
-        session.add(user)
+        await write_queue.submit(update_)
 
-        await session.commit()
+        for k, v in user_data.items():
+            setattr(user, k, v)
 
-        return user
\ No newline at end of file
+        return user
@@ -1,5 +1,8 @@
+import asyncio
 import logging
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from itsdangerous import URLSafeTimedSerializer
 from fastapi import Depends, HTTPException, status
@@ -8,9 +11,23 @@ import jwt
 from passlib.context import CryptContext
 
 from src.config import Config
+from src.errors import PasswordHashingBusy
+from src.metrics import (
+    PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_QUEUE_WAIT,
+    PASSWORD_HASH_REJECTED,
+)
 
 passwd_context = CryptContext(schemes=["bcrypt"])
 
+# bcrypt takes hundreds of milliseconds per call, so async code hashes on a
+# dedicated pool; callers wait for a free worker for at most
+# PASSWORD_HASH_QUEUE_TIMEOUT seconds before being turned away.
+password_executor = ThreadPoolExecutor(
+    max_workers=Config.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+password_slots = asyncio.Semaphore(Config.PASSWORD_HASH_WORKERS)
+
 ACCESS_TOKEN_EXPIRY = 600
 
 serializer = URLSafeTimedSerializer(
@@ -26,6 +43,40 @@ def verify_password(password: str, hash: str) -> bool:
     return passwd_context.verify(password, hash)
 
 
+async def run_password_task(operation: str, func, *args):
+    queued_at = time.perf_counter()
+
+    try:
+        await asyncio.wait_for(
+            password_slots.acquire(), timeout=Config.PASSWORD_HASH_QUEUE_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        PASSWORD_HASH_REJECTED.inc()
+        raise PasswordHashingBusy()
+
+    started_at = time.perf_counter()
+    PASSWORD_HASH_QUEUE_WAIT.observe(started_at - queued_at)
+
+    try:
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(password_executor, func, *args)
+
+    finally:
+        password_slots.release()
+        PASSWORD_HASH_DURATION.labels(operation).observe(
+            time.perf_counter() - started_at
+        )
+
+
+async def generate_passwd_hash_async(password: str) -> str:
+    return await run_password_task("hash", generate_passwd_hash, password)
+
+
+async def verify_password_async(password: str, hash: str) -> bool:
+    return await run_password_task("verify", verify_password, password, hash)
+
+
 def create_access_token(
     user_data: dict, jti: uuid.UUID, expiry: timedelta = None
 ):
@@ -6,11 +6,13 @@ from dramatiq.brokers.redis import RedisBroker
 
 from src.mail import create_message, mail
 from src.config import Config
+from src.metrics import TaskMetrics
 
 import logging
 
 broker = RedisBroker(url=Config.REDIS_URL + '/1')
 broker.add_middleware(AsyncIO())
+broker.add_middleware(TaskMetrics())
 dramatiq.set_broker(broker)
 
 logger = logging.getLogger(__name__)
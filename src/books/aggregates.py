@@ -0,0 +1,117 @@
+"""Rating aggregates stored on each book
+
+Every book carries `review_count`, `rating_sum` and a per-star histogram
+(`rating_1` .. `rating_5`). ReviewService adjusts them in the same
+transaction that adds or deletes a review, so readers never have to load
+the reviews to show a rating.
+
+Run as a module to check the stored aggregates against the reviews table
+and repair any that drifted:
+
+    python -m src.books.aggregates [--check]
+"""
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import bindparam, case, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import Book, Review
+
+RATINGS = range(1, 6)
+
+AGGREGATES = ("review_count", "rating_sum", *(f"rating_{r}" for r in RATINGS))
+
+
+async def apply_review(session: AsyncSession, book_uid: str, rating: int, sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) one review's rating on its book"""
+
+    values = {
+        Book.review_count: Book.review_count + sign,
+        Book.rating_sum: Book.rating_sum + sign * rating,
+    }
+
+    # reviews written before ratings were bounded to 1..5 have no
+    # histogram column but still count towards the totals
+    if rating in RATINGS:
+        rating_column = getattr(Book, f"rating_{rating}")
+        values[rating_column] = rating_column + sign
+
+    await session.execute(update(Book).where(Book.uid == book_uid).values(values))
+
+
+async def verify_aggregates(session: AsyncSession, fix: bool = True) -> list:
+    """Recompute every book's aggregates in one pass and return the drifted ones
+
+    Each drifted book is returned as a dict of its uid and the recomputed
+    values. With `fix`, the stored values are overwritten with them.
+    """
+
+    actual = (
+        select(
+            Review.book_uid,
+            func.count().label("review_count"),
+            func.sum(Review.rating).label("rating_sum"),
+            *(
+                func.sum(case((Review.rating == r, 1), else_=0)).label(f"rating_{r}")
+                for r in RATINGS
+            ),
+        )
+        .group_by(Review.book_uid)
+        .subquery()
+    )
+
+    recomputed = [func.coalesce(actual.c[name], 0).label(name) for name in AGGREGATES]
+
+    statement = (
+        select(Book.uid, *recomputed)
+        .outerjoin(actual, actual.c.book_uid == Book.uid)
+        .where(
+            or_(
+                *(
+                    getattr(Book, name) != value
+                    for name, value in zip(AGGREGATES, recomputed)
+                )
+            )
+        )
+    )
+
+    drifted = [dict(row._mapping) for row in await session.execute(statement)]
+
+    if fix and drifted:
+        await session.execute(
+            update(Book.__table__)
+            .where(Book.__table__.c.uid == bindparam("b_uid"))
+            .values({name: bindparam(f"new_{name}") for name in AGGREGATES}),
+            [
+                {"b_uid": row["uid"], **{f"new_{name}": row[name] for name in AGGREGATES}}
+                for row in drifted
+            ],
+        )
+        await session.commit()
+
+    return drifted
+
+
+async def main(check_only: bool) -> int:
+    from src.db.main import async_session_maker
+
+    async with async_session_maker() as session:
+        drifted = await verify_aggregates(session, fix=not check_only)
+
+    for row in drifted:
+        print(f"{row['uid']}: {', '.join(f'{n}={row[n]}' for n in AGGREGATES)}")
+
+    action = "found" if check_only else "repaired"
+    print(f"{len(drifted)} books with drifted rating aggregates {action}")
+
+    return 1 if check_only and drifted else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verify and backfill book rating aggregates")
+    parser.add_argument(
+        "--check", action="store_true", help="only report drift, exit 1 if any is found"
+    )
+    sys.exit(asyncio.run(main(parser.parse_args().check)))
@@ -0,0 +1,52 @@
+"""Chunk encoders for the streaming catalogue export
+
+Each encoder turns one partition of rows into one body chunk, so the
+response never holds more than a partition in memory.
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import AsyncIterator, Sequence
+
+from .schemas import Book
+
+EXPORT_FIELDS = tuple(Book.model_fields)
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _isoformat(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(rows: Sequence) -> bytes:
+    return "".join(
+        json.dumps({k: _isoformat(v) for k, v in row._mapping.items()}) + "\n"
+        for row in rows
+    ).encode()
+
+
+def csv_header() -> bytes:
+    return (",".join(EXPORT_FIELDS) + "\r\n").encode()
+
+
+def encode_csv(rows: Sequence) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerows([_isoformat(v) for v in row] for row in rows)
+    return out.getvalue().encode()
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
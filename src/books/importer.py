@@ -0,0 +1,147 @@
+"""Streaming parsers for bulk book imports
+
+Both parsers read the request body chunk by chunk and yield one
+`(row, record)` pair at a time, so memory stays bounded by the largest
+record rather than the size of the upload. `record` is the parsed dict, or
+an `ImportRowError` when the row could not be parsed.
+"""
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Union
+
+# a record longer than this many bytes is reported as an error and skipped
+MAX_RECORD_LENGTH = 64 * 1024
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+CSV_TYPES = ("text/csv",)
+
+
+class ImportRowError(Exception):
+    pass
+
+
+Record = Union[dict, ImportRowError]
+
+
+def _decode(line: bytes) -> Union[str, ImportRowError]:
+    try:
+        return line.rstrip(b"\r").decode("utf-8")
+    except UnicodeDecodeError:
+        return ImportRowError("Invalid UTF-8")
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[tuple[int, Union[str, ImportRowError]]]:
+    """Split a byte stream into numbered, decoded lines without line endings
+
+    Lines are split as bytes and decoded one at a time: a newline byte
+    never occurs inside a UTF-8 sequence, so a line that is not valid
+    UTF-8 only costs that line. Numbers count every physical line,
+    blank ones included.
+    """
+
+    buffer = b""
+    number = 0
+    oversized = False
+
+    async for chunk in chunks:
+        *lines, buffer = (buffer + chunk).split(b"\n")
+
+        for line in lines:
+            number += 1
+            if number == 1:
+                line = line.removeprefix(codecs.BOM_UTF8)
+            if oversized:
+                # the rest of a record that was already reported
+                oversized = False
+                continue
+            yield number, _decode(line)
+
+        if len(buffer) > MAX_RECORD_LENGTH:
+            if not oversized:
+                yield number + 1, ImportRowError(
+                    f"Record is longer than {MAX_RECORD_LENGTH} bytes"
+                )
+            oversized = True
+            buffer = b""
+
+    if number == 0:
+        buffer = buffer.removeprefix(codecs.BOM_UTF8)
+
+    if buffer and not oversized:
+        yield number + 1, _decode(buffer)
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, Record]]:
+    """Parse one JSON object per line; rows are numbered by source line"""
+
+    async for row, line in iter_lines(chunks):
+        if isinstance(line, ImportRowError):
+            yield row, line
+            continue
+
+        if not line.strip():
+            continue
+
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield row, ImportRowError("Invalid JSON")
+            continue
+
+        if not isinstance(record, dict):
+            yield row, ImportRowError("Expected a JSON object")
+            continue
+
+        yield row, record
+
+
+async def iter_csv(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, Record]]:
+    """Parse CSV with a header row; quoted fields may span lines"""
+
+    header = None
+    pending = []
+    row = 0
+
+    async for _, line in iter_lines(chunks):
+        if isinstance(line, ImportRowError):
+            pending = []
+            row += 1
+            yield row, line
+            continue
+
+        pending.append(line)
+        record = "\n".join(pending)
+
+        # an odd number of quotes means a quoted field continues on the next line
+        if record.count('"') % 2:
+            if len(record) <= MAX_RECORD_LENGTH:
+                continue
+            pending = []
+            row += 1
+            yield row, ImportRowError(f"Record is longer than {MAX_RECORD_LENGTH} characters")
+            continue
+
+        pending = []
+
+        if not record.strip():
+            continue
+
+        values = next(csv.reader([record]))
+
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        row += 1
+
+        if len(values) != len(header):
+            yield row, ImportRowError(f"Expected {len(header)} fields, got {len(values)}")
+            continue
+
+        yield row, dict(zip(header, values))
+
+    if pending:
+        yield row + 1, ImportRowError("Unterminated quoted field")
@@ -1,40 +1,80 @@
-from typing import List
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from fastapi.exceptions import HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from src.auth.dependencies import AccessTokenBearer, RoleChecker
+from src import conditional
+from src.auth.dependencies import RoleChecker, access_token_bearer
 from src.books.service import BookService
-from src.db.main import get_session
-
-from .schemas import Book, BookCreateModel, BookDetailModel, BookUpdateModel
+from src.db.main import get_session, get_session_maker
+from src.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.response_cache import cached_response, response_cache
+from src.serialization import dump_json, json_response
+
+from . import exporter
+from .schemas import (
+    Book,
+    BookCreateModel,
+    BookDetailModel,
+    BookImportReport,
+    BookListQuery,
+    BookPage,
+    BookUpdateModel,
+)
 
 book_router = APIRouter()
 book_service = BookService()
-access_token_bearer = AccessTokenBearer()
 role_checker = Depends(RoleChecker(["admin", "user"]))
 
 
-@book_router.get("/", response_model=List[Book], dependencies=[role_checker])
+@book_router.get("/", response_model=BookPage, dependencies=[role_checker])
 async def get_all_books(
-    session: AsyncSession = Depends(get_session),
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    query: BookListQuery = Depends(),
+    session_maker: async_sessionmaker = Depends(get_session_maker),
     _: dict = Depends(access_token_bearer),
 ):
-    books = await book_service.get_all_books(session)
-    return books
+    async def build() -> bytes:
+        async with session_maker() as session:
+            books = await book_service.get_all_books(session, cursor, limit, query)
+
+            return dump_json(BookPage, books)
+
+    body, state = await response_cache.get_or_build(
+        "books", request.query_params.multi_items(), ("books",), build
+    )
+
+    return cached_response(body, state)
 
 
 @book_router.get(
-    "/user/{user_uid}", response_model=List[Book], dependencies=[role_checker]
+    "/user/{user_uid}", response_model=BookPage, dependencies=[role_checker]
 )
 async def get_user_book_submissions(
     user_uid: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     session: AsyncSession = Depends(get_session),
     _: dict = Depends(access_token_bearer),
 ):
-    books = await book_service.get_user_books(user_uid, session)
-    return books
+    books = await book_service.get_user_books(user_uid, session, cursor, limit)
+    return json_response(BookPage, books)
+
+
+@book_router.get("/search", response_model=BookPage, dependencies=[role_checker])
+async def search_books(
+    q: str = Query(min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_session),
+    _: dict = Depends(access_token_bearer),
+):
+    books = await book_service.search_books(q, session, cursor, limit)
+    return json_response(BookPage, books)
 
 
 @book_router.post(
@@ -45,12 +85,56 @@ async def get_user_book_submissions(
 )
 async def create_a_book(
     book_data: BookCreateModel,
-    session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer),
 ) -> dict:
     user_id = token_details["user"]["user_uid"]
-    new_book = await book_service.create_book(book_data, user_id, session)
-    return new_book
+    new_book = await book_service.create_book(book_data, user_id)
+    return json_response(Book, new_book, status.HTTP_201_CREATED)
+
+
+@book_router.get("/export", dependencies=[role_checker])
+async def export_books(
+    export_format: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    after: Optional[str] = None,
+    gzip: bool = False,
+    session: AsyncSession = Depends(get_session),
+    session_maker: async_sessionmaker = Depends(get_session_maker),
+    _: dict = Depends(access_token_bearer),
+):
+    chunks = await book_service.export_books(
+        session, session_maker, export_format, after, gzip
+    )
+
+    headers = {"Content-Disposition": f'attachment; filename="books.{export_format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        chunks, media_type=exporter.MEDIA_TYPES[export_format], headers=headers
+    )
+
+
+@book_router.post(
+    "/import",
+    response_model=BookImportReport,
+    dependencies=[role_checker],
+)
+async def import_books(
+    request: Request,
+    token_details: dict = Depends(access_token_bearer),
+):
+    user_id = token_details["user"]["user_uid"]
+    report = await book_service.import_books(
+        request.stream(), request.headers.get("content-type", ""), user_id
+    )
+
+    # a stopped import still reports what it committed
+    status_code = (
+        status.HTTP_200_OK if report["error"] is None
+        else status.HTTP_500_INTERNAL_SERVER_ERROR
+    )
+
+    return json_response(BookImportReport, report, status_code)
 
 
 @book_router.get(
@@ -58,24 +142,32 @@ async def create_a_book(
 )
 async def get_book(
     book_uid: str,
+    request: Request,
     session: AsyncSession = Depends(get_session),
     _: dict = Depends(access_token_bearer),
 ) -> dict:
-    book = await book_service.get_book(book_uid, session)
+    version, update_at = await book_service.get_book_version(book_uid, session)
+
+    etag = conditional.make_etag("book", book_uid, version)
+    headers = conditional.validator_headers(etag, update_at)
 
-    return book
+    if conditional.is_not_modified(request, etag, update_at):
+        return conditional.not_modified(headers)
+
+    book = await book_service.get_book_detail(book_uid, session)
+
+    return json_response(BookDetailModel, book, headers=headers)
 
 
 @book_router.patch("/{book_uid}", response_model=Book, dependencies=[role_checker])
 async def update_book(
     book_uid: str,
     book_update_data: BookUpdateModel,
-    session: AsyncSession = Depends(get_session),
     _: dict = Depends(access_token_bearer),
 ) -> dict:
-    new_book = await book_service.update_book(book_uid, book_update_data, session)
+    new_book = await book_service.update_book(book_uid, book_update_data)
         
-    return new_book
+    return json_response(Book, new_book)
 
 
 @book_router.delete(
@@ -83,9 +175,8 @@ async def update_book(
 )
 async def delete_book(
     book_uid: str,
-    session: AsyncSession = Depends(get_session),
     _: dict = Depends(access_token_bearer),
 ):
-    book_to_delete = await book_service.delete_book(book_uid, session)
+    book_to_delete = await book_service.delete_book(book_uid)
     
     return book_to_delete
\ No newline at end of file
@@ -1,6 +1,6 @@
 import uuid
 from datetime import date, datetime
-from typing import List
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel
 
@@ -16,10 +16,33 @@ class Book(BaseModel):
     published_date: date
     page_count: int
     language: str
+    review_count: int
+    rating_sum: int
+    rating_1: int
+    rating_2: int
+    rating_3: int
+    rating_4: int
+    rating_5: int
+    rating_avg: Optional[float]
     created_at: datetime
     update_at: datetime
 
 
+class BookPage(BaseModel):
+    items: List[Book]
+    next_cursor: Optional[str] = None
+
+
+class BookListQuery(BaseModel):
+    author: Optional[str] = None
+    language: Optional[str] = None
+    publisher: Optional[str] = None
+    published_from: Optional[date] = None
+    published_to: Optional[date] = None
+    sort: Literal["created_at", "published_date", "page_count", "rating"] = "created_at"
+    order: Literal["asc", "desc"] = "desc"
+
+
 class BookCreateModel(BaseModel):
     title: str
     author: str
@@ -39,4 +62,18 @@ class BookUpdateModel(BaseModel):
 
 class BookDetailModel(Book):
     reviews: List[ReviewModel]
-    tags:List[TagModel]
\ No newline at end of file
+    tags:List[TagModel]
+
+class BookImportError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class BookImportReport(BaseModel):
+    imported: int
+    failed: int
+    errors: List[BookImportError]
+    errors_truncated: bool = False
+    # set when a database error stopped the import part way
+    error: Optional[str] = None
+    stopped_at_row: Optional[int] = None
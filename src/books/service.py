@@ -1,33 +1,173 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Optional
 
-from sqlmodel import desc, select
+from pydantic import ValidationError
+from sqlmodel import select
+from sqlalchemy import Date, Float, Integer, column, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import UnaryExpression
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from src.db.models import Book
-from .schemas import BookCreateModel, BookUpdateModel
-from src.errors import BookNotFound
+from src.db import fts
+from src.db.models import BOOK_FILTERS, Book
+from src.db.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+    keyset_page,
+)
+from src.db.writer import write_queue
+from src.response_cache import response_cache
+from . import exporter, importer
+from .schemas import BookCreateModel, BookListQuery, BookUpdateModel
+from src.errors import BookNotFound, UnsupportedBookQuery, UnsupportedImportFormat
+
+logger = logging.getLogger(__name__)
+
+# rows written per transaction by import_books
+IMPORT_CHUNK_SIZE = 500
+# row errors listed in an import report; further errors are only counted
+MAX_IMPORT_ERRORS = 100
+# rows fetched from the cursor and encoded per chunk by export_books
+EXPORT_CHUNK_SIZE = 1000
+
+SORT_COLUMNS = {
+    "created_at": Book.created_at,
+    "published_date": Book.published_date,
+    "page_count": Book.page_count,
+    "rating": Book.rating_avg,
+}
 
 
 class BookService:
-    async def get_all_books(self, session: AsyncSession):
-        statement = select(Book).order_by(desc(Book.created_at))
+    async def get_all_books(
+        self,
+        session: AsyncSession,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        query: Optional[BookListQuery] = None,
+    ):
+        """List books matching `query`, in its sort order
 
-        result = await session.execute(statement)
+        Every allowed combination - at most one equality filter, an optional
+        published_date range and any sort - walks one of the
+        ix_books_<filter>_<sort>_uid indexes in order, so no combination
+        needs a sort step. A published_date range under another sort is
+        checked row by row along that walk.
+        """
+
+        query = query or BookListQuery()
+
+        filters = {
+            name: value
+            for name in BOOK_FILTERS
+            if (value := getattr(query, name)) is not None
+        }
+
+        if len(filters) > 1:
+            raise UnsupportedBookQuery()
+
+        statement = select(Book).where(
+            *(getattr(Book, name) == value for name, value in filters.items())
+        )
+
+        published_date = Book.published_date
+
+        if query.sort != "published_date":
+            # Unary + keeps the value but stops SQLite from choosing a
+            # published_date index for the range, which would then need a
+            # sort; the range is checked while walking the sort index instead
+            published_date = UnaryExpression(
+                published_date, operator=operators.custom_op("+"), type_=Date
+            )
+
+        if query.published_from is not None:
+            statement = statement.where(published_date >= query.published_from)
+        if query.published_to is not None:
+            statement = statement.where(published_date <= query.published_to)
+
+        return await keyset_page(
+            session,
+            statement,
+            (SORT_COLUMNS[query.sort], Book.uid),
+            cursor,
+            limit,
+            descending=query.order == "desc",
+            # unrated books have no average and list after the rated ones
+            nulls_last=query.sort == "rating",
+        )
+
+    async def get_user_books(
+        self,
+        user_uid: str,
+        session: AsyncSession,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ):
+        statement = select(Book).where(Book.user_uid == user_uid)
+
+        return await keyset_page(
+            session, statement, (Book.created_at, Book.uid), cursor, limit
+        )
+
+    async def search_books(
+        self,
+        query: str,
+        session: AsyncSession,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ):
+        """Full-text search over title, author and publisher, best match first
+
+        Pages are keyed on (bm25 rank, rowid), which is best-effort: bm25
+        weighs terms by statistics of the whole catalogue, so adding or
+        editing any book shifts every rank, and a page fetched after such
+        a write may skip or repeat results near its boundary.
+        """
 
-        return result.scalars().all()
+        match = fts.match_query(query)
+
+        if not match:
+            return {"items": [], "next_cursor": None}
+
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        rank, rowid = fts.rank, fts.books_fts.c.rowid
+
+        # rank inside the FTS table and only join the page back to books
+        matches = select(rowid, rank.label("rank")).where(column("books_fts").match(match))
+
+        if cursor:
+            after = decode_cursor(cursor, (column("rank", Float), column("rowid", Integer)))
+            matches = matches.where(tuple_(rank, rowid) > tuple_(*after))
+
+        matches = matches.order_by(rank, rowid).limit(limit + 1).subquery()
 
-    async def get_user_books(self, user_uid: str, session: AsyncSession):
         statement = (
-            select(Book)
-            .where(Book.user_uid == user_uid)
-            .order_by(desc(Book.created_at))
+            select(Book, matches.c.rank, matches.c.rowid)
+            .join(matches, fts.books_rowid == matches.c.rowid)
+            .order_by(matches.c.rank, matches.c.rowid)
         )
 
-        result = await session.execute(statement)
+        rows = (await session.execute(statement)).all()
 
-        return result.scalars().all()
+        next_cursor = None
 
-    async def get_book(self, book_uid: str, session: AsyncSession):
-        statement = select(Book).where(Book.uid == book_uid)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(*rows[-1][1:])
+
+        return {"items": [row[0] for row in rows], "next_cursor": next_cursor}
+
+    async def get_book(self, book_uid: str, session: AsyncSession, *options):
+        """Get a book, eager-loading only the relationships in `options`"""
+
+        statement = select(Book).where(Book.uid == book_uid).options(*options)
 
         result = await session.execute(statement)
 
@@ -38,44 +178,249 @@ class BookService:
 
         return book 
 
-    async def create_book(
-        self, book_data: BookCreateModel, user_uid: str, session: AsyncSession
-    ):
-        book_data_dict = book_data.model_dump()
+    async def get_book_version(self, book_uid: str, session: AsyncSession):
+        """Get the (version, update_at) validators of a book, without loading it"""
 
-        new_book = Book(**book_data_dict)
+        statement = select(Book.version, Book.update_at).where(Book.uid == book_uid)
 
-        new_book.user_uid = user_uid
+        row = (await session.execute(statement)).first()
 
-        session.add(new_book)
+        if row is None:
+            raise BookNotFound()
 
-        await session.commit()
+        return row
 
-        return new_book
+    async def get_book_detail(self, book_uid: str, session: AsyncSession):
+        """Get a book together with the reviews and tags of BookDetailModel"""
 
-    async def update_book(
-        self, book_uid: str, update_data: BookUpdateModel, session: AsyncSession
-    ):
-        book_to_update = await self.get_book(book_uid, session)
+        return await self.get_book(
+            book_uid,
+            session,
+            selectinload(Book.reviews),
+            selectinload(Book.tags),
+        )
+
+    async def create_book(self, book_data: BookCreateModel, user_uid: str):
+        async def create(session: AsyncSession):
+            book_data_dict = book_data.model_dump()
+
+            new_book = Book(**book_data_dict)
+
+            new_book.user_uid = user_uid
+
+            session.add(new_book)
+
+            return new_book
+
+        book = await write_queue.submit(create)
+        await response_cache.invalidate("books")
+
+        return book
+
+    async def update_book(self, book_uid: str, update_data: BookUpdateModel):
+        async def update(session: AsyncSession):
+            book_to_update = await self.get_book(book_uid, session)
 
-        if book_to_update is not None:
             update_data_dict = update_data.model_dump()
 
             for k, v in update_data_dict.items():
                 setattr(book_to_update, k, v)
 
-            session.add(book_to_update)
+            book_to_update.update_at = datetime.now()
 
-            await session.commit()
+            session.add(book_to_update)
 
             return book_to_update
-        
 
-    async def delete_book(self, book_uid: str, session: AsyncSession):
-        book_to_delete = await self.get_book(book_uid, session)
+        book = await write_queue.submit(update)
+        await response_cache.invalidate("books")
+
+        return book
+
+    async def delete_book(self, book_uid: str):
+        async def delete(session: AsyncSession):
+            book_to_delete = await self.get_book(book_uid, session)
+
+            await session.delete(book_to_delete)
+
+            return {}
+
+        result = await write_queue.submit(delete)
+        # the book's reviews lose their book_uid
+        await response_cache.invalidate("books", "reviews")
+
+        return result
+
+    async def import_books(self, chunks, content_type: str, user_uid: str):
+        """Validate and insert books streamed as NDJSON or CSV
+
+        Valid rows are inserted with one executemany per IMPORT_CHUNK_SIZE
+        rows, each chunk in its own write transaction; reading waits for
+        each chunk to commit, so a large upload never piles up in memory.
+        Invalid rows are skipped and listed in the report.
+
+        A database error stops the import at the chunk it hit. Earlier
+        chunks stay committed, so the report then carries the error and
+        `stopped_at_row`, the first source row that was not imported:
+        every row before it was either imported or listed as an error.
+        """
+
+        media_type = content_type.split(";")[0].strip().lower()
+
+        if media_type in importer.NDJSON_TYPES:
+            records = importer.iter_ndjson(chunks)
+        elif media_type in importer.CSV_TYPES:
+            records = importer.iter_csv(chunks)
+        else:
+            raise UnsupportedImportFormat()
+
+        report = {
+            "imported": 0,
+            "failed": 0,
+            "errors": [],
+            "errors_truncated": False,
+            "error": None,
+            "stopped_at_row": None,
+        }
+        batch = []
+        # source row of the first book in `batch`
+        batch_start = None
+        # the previous chunk, still being written while the next one is parsed
+        in_flight = None
+
+        def fail(row, messages):
+            report["failed"] += 1
+            if len(report["errors"]) < MAX_IMPORT_ERRORS:
+                report["errors"].append({"row": row, "errors": messages})
+            else:
+                report["errors_truncated"] = True
+
+        async def insert(rows, first_row):
+            async def insert_chunk(session: AsyncSession):
+                await session.execute(Book.__table__.insert(), rows)
+
+            try:
+                await write_queue.submit(insert_chunk)
+            except SQLAlchemyError:
+                logger.exception("Book import stopped at row %d", first_row)
+                report["error"] = "A database error stopped the import"
+                report["stopped_at_row"] = first_row
+                return
+
+            await response_cache.invalidate("books")
+            report["imported"] += len(rows)
+
+        async def flush():
+            nonlocal in_flight
+
+            if in_flight is not None:
+                await in_flight
+                in_flight = None
+
+            if report["error"] is None:
+                in_flight = asyncio.ensure_future(insert(list(batch), batch_start))
+
+            batch.clear()
+
+        try:
+            async for row, record in records:
+                if isinstance(record, importer.ImportRowError):
+                    fail(row, [str(record)])
+                    continue
+
+                try:
+                    book = BookCreateModel.model_validate(record)
+                except ValidationError as e:
+                    fail(
+                        row,
+                        [
+                            f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}"
+                            for error in e.errors()
+                        ],
+                    )
+                    continue
+
+                if not batch:
+                    batch_start = row
+
+                now = datetime.now()
+                # filled in here rather than by the column defaults, which
+                # SQLAlchemy would otherwise evaluate row by row
+                batch.append(
+                    {
+                        "uid": str(uuid.uuid4()),
+                        **book.model_dump(),
+                        "user_uid": user_uid,
+                        "created_at": now,
+                        "update_at": now,
+                    }
+                )
+
+                if len(batch) >= IMPORT_CHUNK_SIZE:
+                    await flush()
+
+                    if report["error"] is not None:
+                        break
+
+            if batch:
+                await flush()
+
+        finally:
+            # awaited even when reading fails, so the last chunk's outcome
+            # is in the report and its task is never left unobserved
+            if in_flight is not None:
+                await in_flight
+
+        return report
+
+    async def export_books(
+        self,
+        session: AsyncSession,
+        session_maker,
+        export_format: str = "ndjson",
+        after: Optional[str] = None,
+        compress: bool = False,
+    ):
+        """Return the catalogue as a stream of NDJSON or CSV chunks
+
+        Books come oldest first; `after` resumes right after the book with
+        that uid. `after` is resolved here, on the request's session, so a
+        missing book is still a 404 rather than a broken stream.
+        """
+
+        start = None
+
+        if after is not None:
+            created_at = await session.scalar(
+                select(Book.created_at).where(Book.uid == after)
+            )
+
+            if created_at is None:
+                raise BookNotFound()
+
+            start = (created_at, after)
+
+        chunks = self._stream_books(session_maker, export_format, start)
+
+        return exporter.gzip_chunks(chunks) if compress else chunks
+
+    async def _stream_books(self, session_maker, export_format: str, start):
+        columns = [Book.__table__.c[name] for name in exporter.EXPORT_FIELDS]
+        statement = select(*columns).order_by(Book.created_at, Book.uid)
+
+        if start is not None:
+            statement = statement.where(tuple_(Book.created_at, Book.uid) > tuple_(*start))
+
+        encode = exporter.encode_csv if export_format == "csv" else exporter.encode_ndjson
 
-        await session.delete(book_to_delete)
+        if export_format == "csv":
+            yield exporter.csv_header()
 
-        await session.commit()
+        # one read transaction, so the export is a consistent snapshot
+        async with session_maker() as session:
+            result = await session.stream(
+                statement.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+            )
 
-        return {}
+            async for rows in result.partitions(EXPORT_CHUNK_SIZE):
+                yield encode(rows)
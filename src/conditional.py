@@ -0,0 +1,68 @@
+"""ETag and Last-Modified validators for conditional GETs
+
+Routes look up a resource's version first, with a query that touches no
+ORM objects, and answer a matching If-None-Match or If-Modified-Since with
+a bare 304 before loading or serializing anything.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    """A strong ETag over the parts that identify one representation"""
+
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+    return f'"{digest}"'
+
+
+def _utc(value: datetime) -> datetime:
+    # update_at columns hold naive local times
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> dict:
+    headers = {"ETag": etag}
+
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """Whether the client's cached copy is current
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted
+    when the request has no If-None-Match (RFC 9110, 13.2.2).
+    """
+
+    if_none_match = request.headers.get("if-none-match")
+
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # If-None-Match uses weak comparison
+        return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+
+    if if_modified_since is None or last_modified is None:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+    if since.tzinfo is None:
+        return False
+
+    return _utc(last_modified) <= since
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
@@ -1,8 +1,23 @@
+from typing import Literal, Union
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    DB_ECHO: Union[bool, Literal["debug"]] = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT: int = 5000
+    SQLITE_CACHE_SIZE: int = -20000
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    WRITE_GROUP_COMMIT: bool = False
+    WRITE_BATCH_WINDOW_MS: float = 2.0
+    WRITE_BATCH_MAX: int = 64
     JWT_SECRET: str
     JWT_ALGORITHM: str
     REDIS_URL: str
@@ -18,6 +33,21 @@ class Settings(BaseSettings):
     VALIDATE_CERTS: bool = True
     DOMAIN: str
     APP_PORT: str
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_POOL_TIMEOUT: float = 5.0
+    REDIS_SOCKET_TIMEOUT: float = 5.0
+    REVOCATION_CACHE_SIZE: int = 100_000
+    REVOCATION_FAIL_OPEN: bool = False
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL: float = 30
+    RESPONSE_CACHE_STALE_TTL: float = 300
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0
+    ACCESS_LOG_SLOW_MS: float = 500
+    SQL_PROFILING: bool = False
+    SQL_REPEAT_THRESHOLD: int = 5
+    SQL_SLOW_QUERY_MS: float = 100
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 5.0
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
 
@@ -0,0 +1,85 @@
+"""Full-text index over the title, author and publisher of books
+
+`books_fts` is an FTS5 external-content table: it only stores the index
+and reads the text back from `books` by rowid. Triggers keep it in step
+with every insert, update and delete on `books`. The same statements are
+run by migration 0f3b7c9e2a41 and, for `create_all`, by `register`.
+
+`books` has no INTEGER PRIMARY KEY, so VACUUM may renumber its rowids; run
+REBUILD_BOOKS_FTS after a VACUUM.
+"""
+import re
+
+from sqlalchemy import DDL, Integer, column, event, func, literal_column, table
+
+CREATE_BOOKS_FTS = (
+    """
+    CREATE VIRTUAL TABLE books_fts USING fts5(
+        title, author, publisher,
+        content='books', content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER books_fts_ai AFTER INSERT ON books BEGIN
+        INSERT INTO books_fts(rowid, title, author, publisher)
+        VALUES (new.rowid, new.title, new.author, new.publisher);
+    END
+    """,
+    """
+    CREATE TRIGGER books_fts_ad AFTER DELETE ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, publisher)
+        VALUES ('delete', old.rowid, old.title, old.author, old.publisher);
+    END
+    """,
+    """
+    CREATE TRIGGER books_fts_au AFTER UPDATE OF title, author, publisher ON books BEGIN
+        INSERT INTO books_fts(books_fts, rowid, title, author, publisher)
+        VALUES ('delete', old.rowid, old.title, old.author, old.publisher);
+        INSERT INTO books_fts(rowid, title, author, publisher)
+        VALUES (new.rowid, new.title, new.author, new.publisher);
+    END
+    """,
+)
+
+DROP_BOOKS_FTS = (
+    "DROP TRIGGER IF EXISTS books_fts_au",
+    "DROP TRIGGER IF EXISTS books_fts_ad",
+    "DROP TRIGGER IF EXISTS books_fts_ai",
+    "DROP TABLE IF EXISTS books_fts",
+)
+
+REBUILD_BOOKS_FTS = "INSERT INTO books_fts(books_fts) VALUES ('rebuild')"
+
+# bm25 weights of the title, author and publisher columns
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+books_fts = table("books_fts", column("rowid", Integer))
+books_rowid = literal_column("books.rowid", Integer)
+rank = func.bm25(literal_column("books_fts"), *BM25_WEIGHTS)
+
+
+def match_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching every word
+
+    Each word is quoted so that FTS5 operators typed by the user are taken
+    literally; the last word also matches as a prefix. Returns "" when the
+    text has no words.
+    """
+
+    words = re.findall(r"\w+", text)
+
+    if not words:
+        return ""
+
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+
+def register(books_table) -> None:
+    """Create and drop books_fts together with `books_table` in create_all"""
+
+    for statement in CREATE_BOOKS_FTS:
+        event.listen(books_table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+    for statement in DROP_BOOKS_FTS:
+        event.listen(books_table, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
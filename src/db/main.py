@@ -1,10 +1,146 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlmodel import SQLModel
 from typing import AsyncGenerator
 
-from src.config import Config
+from src.config import Config, Settings
+from src.metrics import DB_STATEMENT_DURATION
+
+
+def sqlite_pragmas(settings: Settings = Config) -> dict:
+    """PRAGMAs applied to every new SQLite connection"""
+
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+
+
+def apply_sqlite_pragmas(engine: AsyncEngine, pragmas: dict) -> None:
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+        cursor.close()
+
+
+def emit_sqlite_begin(engine: AsyncEngine) -> None:
+    """Let SQLAlchemy, not the driver, start transactions
+
+    pysqlite only emits BEGIN implicitly before DML, never before a
+    SAVEPOINT, so a savepoint opened first becomes the outermost
+    transaction and its RELEASE commits. With the driver in autocommit
+    and an explicit BEGIN per transaction, savepoints nest inside it.
+
+    The BEGIN is IMMEDIATE: write jobs read before they write, and a
+    deferred transaction whose snapshot another process committed past
+    fails its upgrade to a writer with SQLITE_BUSY, which busy_timeout
+    does not retry. Taking the write lock up front waits on it instead.
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Time every statement the driver executes, by engine and SQL verb"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._statement_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def observe(conn, cursor, statement, parameters, context, executemany):
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+
+        DB_STATEMENT_DURATION.labels(name, operation).observe(
+            time.perf_counter() - context._statement_started
+        )
+
+
+def is_in_memory(url: str) -> bool:
+    database = make_url(url).database
 
-async_engine = create_async_engine(url=Config.DATABASE_URL, echo=True)
+    return not database or database == ":memory:"
+
+
+def build_engine(
+    url: str, settings: Settings = Config, read_only: bool = False
+) -> AsyncEngine:
+    """Create the writer engine, or with `read_only` the reader pool
+
+    The writer holds exactly one connection: SQLite serializes writers
+    anyway, and src.db.writer queues every write onto it. Readers get a
+    pool of DB_POOL_SIZE connections opened with `query_only`, which under
+    WAL read concurrently with the writer.
+    """
+
+    options = {"echo": settings.DB_ECHO}
+
+    # aiosqlite defaults to NullPool, reconnecting (and re-running every
+    # PRAGMA) per session; file-backed databases get a sized pool instead.
+    # In-memory databases stay on their single static connection.
+    if not is_in_memory(url):
+        options.update(
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.DB_POOL_SIZE if read_only else 1,
+            max_overflow=settings.DB_MAX_OVERFLOW if read_only else 0,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+
+    engine = create_async_engine(url, **options)
+
+    if engine.dialect.name == "sqlite":
+        pragmas = sqlite_pragmas(settings)
+
+        if read_only:
+            pragmas["query_only"] = "ON"
+
+        apply_sqlite_pragmas(engine, pragmas)
+
+        # the group-commit writer runs each job in a savepoint
+        if not read_only:
+            emit_sqlite_begin(engine)
+
+    instrument_engine(engine, "read" if read_only else "write")
+
+    return engine
+
+
+async_engine = build_engine(Config.DATABASE_URL)
+
+# An in-memory database exists only on the writer's connection, so readers
+# have to share it.
+read_engine = (
+    async_engine
+    if is_in_memory(Config.DATABASE_URL)
+    else build_engine(Config.DATABASE_URL, read_only=True)
+)
+
+async_session_maker = async_sessionmaker(async_engine, expire_on_commit=False)
+
+read_session_maker = async_sessionmaker(read_engine, expire_on_commit=False)
 
 
 async def init_db() -> None:
@@ -13,9 +149,17 @@ async def init_db() -> None:
 
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    Session = async_sessionmaker(
-        async_engine, expire_on_commit=False
-    )
+    """Read-only session for request handlers; writes go through write_queue"""
+
+    async with read_session_maker() as session:
+        yield session
+
+
+def get_session_maker() -> async_sessionmaker:
+    """Read session factory for responses that outlive the request handler
+
+    A StreamingResponse body runs after `get_session` has closed its
+    session, so it has to open its own.
+    """
 
-    async with Session() as session:
-        yield session
\ No newline at end of file
+    return read_session_maker
@@ -3,8 +3,11 @@ from datetime import date, datetime
 from typing import List, Optional
 
 import sqlalchemy.dialects.sqlite as sqlite
+from sqlalchemy import Computed, Index
 from sqlmodel import Column, Field, Relationship, SQLModel
 
+from . import fts, tag_counts, versions
+
 
 class User(SQLModel, table=True):
     __tablename__ = "users"
@@ -19,7 +22,7 @@ class User(SQLModel, table=True):
         )
     )
     username: str
-    email: str
+    email: str = Field(index=True)
     first_name: str
     last_name: str
     role: str = Field(
@@ -32,10 +35,10 @@ class User(SQLModel, table=True):
     created_at: datetime = Field(sa_column=Column(sqlite.TIMESTAMP, default=datetime.now))
     update_at: datetime = Field(sa_column=Column(sqlite.TIMESTAMP, default=datetime.now))
     books: List["Book"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="user", sa_relationship_kwargs={"lazy": "raise"}
     )
     reviews: List["Review"] = Relationship(
-        back_populates="user", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="user", sa_relationship_kwargs={"lazy": "raise"}
     )
 
     def __repr__(self):
@@ -43,11 +46,16 @@ class User(SQLModel, table=True):
 
 
 class BookTag(SQLModel, table=True):
+    __table_args__ = (Index("ix_booktag_tag_id_book_id", "tag_id", "book_id"),)
     book_id: str = Field(default=None, foreign_key="books.uid", primary_key=True)
     tag_id: str = Field(default=None, foreign_key="tags.uid", primary_key=True)
 
 class Tag(SQLModel, table=True):
     __tablename__ = "tags"
+    __table_args__ = (
+        Index("ix_tags_name", "name", unique=True),
+        Index("ix_tags_created_at", "created_at"),
+    )
     uid: str = Field(
         sa_column=Column(
             sqlite.CHAR(36), 
@@ -59,19 +67,51 @@ class Tag(SQLModel, table=True):
         )
     )
     name: str = Field(sa_column=Column(sqlite.VARCHAR, nullable=False))
+    # maintained by the booktag triggers in src/db/tag_counts.py
+    book_count: int = Field(
+        default=0, sa_column=Column(sqlite.INTEGER, nullable=False, default=0, server_default="0")
+    )
+    # bumped on every update by the triggers in src/db/versions.py
+    version: int = Field(
+        default=1, sa_column=Column(sqlite.INTEGER, nullable=False, default=1, server_default="1")
+    )
     created_at: datetime = Field(sa_column=Column(sqlite.TIMESTAMP, default=datetime.now))
+    update_at: datetime = Field(sa_column=Column(sqlite.TIMESTAMP, default=datetime.now))
     books: List["Book"] = Relationship(
         link_model=BookTag,
         back_populates="tags",
-        sa_relationship_kwargs={"lazy": "selectin"},
+        sa_relationship_kwargs={"lazy": "raise"},
     )
 
     def __repr__(self) -> str:
         return f"<Tag {self.name}>"
 
 
+tag_counts.register(BookTag.__table__)
+versions.register(BookTag.__table__)
+versions.register(Tag.__table__)
+
+
+# GET /books takes at most one of these equality filters and one of these
+# sorts; each (filter, sort) pair has its own index, see BookService.get_all_books
+BOOK_FILTERS = ("author", "language", "publisher")
+BOOK_SORTS = ("created_at", "published_date", "page_count", "rating_avg")
+
+
+def book_listing_indexes():
+    for filter_ in (None, *BOOK_FILTERS):
+        for sort in BOOK_SORTS:
+            columns = [c for c in (filter_, sort, "uid") if c]
+            yield Index(f"ix_books_{'_'.join(columns)}", *columns)
+
+
 class Book(SQLModel, table=True):
     __tablename__ = "books"
+    __table_args__ = (
+        *book_listing_indexes(),
+        Index("ix_books_user_uid_created_at_uid", "user_uid", "created_at", "uid"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
     uid: str = Field(
         sa_column=Column(
             sqlite.CHAR(36), 
@@ -89,24 +129,69 @@ class Book(SQLModel, table=True):
     page_count: int
     language: str
     user_uid: Optional[str] = Field(default=None, foreign_key="users.uid")
+    # kept up to date by ReviewService, see src/books/aggregates.py
+    review_count: int = Field(
+        default=0, sa_column=Column(sqlite.INTEGER, nullable=False, default=0, server_default="0")
+    )
+    rating_sum: int = Field(
+        default=0, sa_column=Column(sqlite.INTEGER, nullable=False, default=0, server_default="0")
+    )
+    rating_1: int = Field(
+        default=0, sa_column=Column(sqlite.INTEGER, nullable=False, default=0, server_default="0")
+    )
+    rating_2: int = Field(
+        default=0, sa_column=Column(sqlite.INTEGER, nullable=False, default=0, server_default="0")
+    )
+    rating_3: int = Field(
+        default=0, sa_column=Column(sqlite.INTEGER, nullable=False, default=0, server_default="0")
+    )
+    rating_4: int = Field(
+        default=0, sa_column=Column(sqlite.INTEGER, nullable=False, default=0, server_default="0")
+    )
+    rating_5: int = Field(
+        default=0, sa_column=Column(sqlite.INTEGER, nullable=False, default=0, server_default="0")
+    )
+    rating_avg: Optional[float] = Field(
+        default=None,
+        sa_column=Column(
+            sqlite.FLOAT,
+            # NULL rather than 0 for unrated books, which would rank them
+            # below every book rated 1
+            Computed("CASE WHEN review_count > 0 THEN rating_sum * 1.0 / review_count END"),
+            nullable=True,
+        ),
+    )
+    # bumped on every update by the triggers in src/db/versions.py
+    version: int = Field(
+        default=1, sa_column=Column(sqlite.INTEGER, nullable=False, default=1, server_default="1")
+    )
     created_at: datetime = Field(sa_column=Column(sqlite.TIMESTAMP, default=datetime.now))
     update_at: datetime = Field(sa_column=Column(sqlite.TIMESTAMP, default=datetime.now))
     user: Optional[User] = Relationship(back_populates="books")
     reviews: List["Review"] = Relationship(
-        back_populates="book", sa_relationship_kwargs={"lazy": "selectin"}
+        back_populates="book", sa_relationship_kwargs={"lazy": "raise"}
     )
     tags: List[Tag] = Relationship(
         link_model=BookTag,
         back_populates="books",
-        sa_relationship_kwargs={"lazy": "selectin"},
+        sa_relationship_kwargs={"lazy": "raise"},
     )
 
     def __repr__(self):
         return f"<Book {self.title}>"
 
 
+fts.register(Book.__table__)
+versions.register(Book.__table__)
+
+
 class Review(SQLModel, table=True):
     __tablename__ = "reviews"
+    __table_args__ = (
+        Index("ix_reviews_user_uid_book_uid", "user_uid", "book_uid"),
+        Index("ix_reviews_book_uid", "book_uid"),
+        Index("ix_reviews_created_at", "created_at"),
+    )
     uid: str = Field(
         sa_column=Column(
             sqlite.CHAR(36), 
@@ -117,10 +202,14 @@ class Review(SQLModel, table=True):
             default=lambda: str(uuid.uuid4())  
         )
     )
-    rating: int = Field(lt=5)
+    rating: int = Field(ge=1, le=5)
     review_text: str = Field(sa_column=Column(sqlite.VARCHAR, nullable=False))
     user_uid: Optional[str] = Field(default=None, foreign_key="users.uid")
     book_uid: Optional[str] = Field(default=None, foreign_key="books.uid")
+    # bumped on every update by the triggers in src/db/versions.py
+    version: int = Field(
+        default=1, sa_column=Column(sqlite.INTEGER, nullable=False, default=1, server_default="1")
+    )
     created_at: datetime = Field(sa_column=Column(sqlite.TIMESTAMP, default=datetime.now))
     update_at: datetime = Field(sa_column=Column(sqlite.TIMESTAMP, default=datetime.now))
     user: Optional[User] = Relationship(back_populates="reviews")
@@ -128,4 +217,6 @@ class Review(SQLModel, table=True):
 
     def __repr__(self):
         return f"<Review for book {self.book_uid} by user {self.user_uid}>"
-    
\ No newline at end of file
+    
+
+versions.register(Review.__table__)
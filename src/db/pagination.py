@@ -0,0 +1,143 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import asc, desc, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from src.errors import InvalidCursor
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _from_json(value: Any, column) -> Any:
+    if value is None:
+        return None
+
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        # e.g. sqlmodel's AutoString; JSON already gives the right value
+        return value
+
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+
+    return python_type(value)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor"""
+
+    payload = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> tuple:
+    """Decode a cursor produced by `encode_cursor` back into typed key values"""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+
+        return tuple(_from_json(v, c) for v, c in zip(values, columns))
+
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise InvalidCursor()
+
+
+async def keyset_page(
+    session: AsyncSession,
+    statement: Select,
+    keys: Sequence,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    descending: bool = True,
+    attrs: Optional[Sequence[str]] = None,
+    nulls_last: bool = False,
+) -> dict:
+    """Fetch one page of `statement` ordered by `keys`
+
+    `keys` must end with a unique column so that the order is total. The
+    page continues strictly after the row the cursor points at, so every
+    page is a single index range scan regardless of its depth.
+
+    The next cursor is read from the attributes of the last item named
+    after `keys`; pass `attrs` when a key belongs to a joined table and the
+    item holds its value under another name.
+
+    With `nulls_last`, the first key may be NULL and those rows come after
+    all others in either direction. SQLite keeps NULLs first in an index
+    and a row-value comparison with NULL is never true, so the NULL rows
+    are read as a second range of the same index, only once the first
+    range runs out.
+    """
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    direction = desc if descending else asc
+    after = decode_cursor(cursor, keys) if cursor else None
+
+    def page_of(statement, keys, after, size):
+        if after is not None:
+            row_key, cursor_key = tuple_(*keys), tuple_(*after)
+            statement = statement.where(
+                row_key < cursor_key if descending else row_key > cursor_key
+            )
+
+        return statement.order_by(*(direction(k) for k in keys)).limit(size)
+
+    if not nulls_last:
+        items = (
+            (await session.execute(page_of(statement, keys, after, limit + 1)))
+            .scalars()
+            .all()
+        )
+    else:
+        first, rest = keys[0], keys[1:]
+        items = []
+
+        # a cursor whose first key is NULL is already inside the NULL rows
+        if after is None or after[0] is not None:
+            items = (
+                await session.execute(
+                    page_of(statement.where(first.is_not(None)), keys, after, limit + 1)
+                )
+            ).scalars().all()
+
+        if len(items) <= limit:
+            items += (
+                await session.execute(
+                    page_of(
+                        statement.where(first.is_(None)),
+                        rest,
+                        after[1:] if after is not None and after[0] is None else None,
+                        limit + 1 - len(items),
+                    )
+                )
+            ).scalars().all()
+
+    next_cursor = None
+
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        names = attrs or [k.key for k in keys]
+        next_cursor = encode_cursor(*(getattr(last, name) for name in names))
+
+    return {"items": items, "next_cursor": next_cursor}
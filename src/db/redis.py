@@ -1,10 +1,77 @@
+import time
+
 import redis.asyncio as aioredis # type: ignore
 
 from src.config import Config
+from src.metrics import REDIS_COMMAND_DURATION
 
 JTI_EXPIRY = 172800
 
-token_logout = aioredis.from_url(Config.REDIS_URL + '/0')
+# Revoked access-token JTIs are announced on this channel and kept, scored by
+# their expiry time, in this sorted set so that a process subscribing late can
+# catch up on revocations it missed.
+REVOKED_JTI_CHANNEL = "revoked-jti"
+REVOKED_JTI_SET = "revoked-jti:expiry"
+
+# Connections are capped; callers wait up to REDIS_POOL_TIMEOUT for a free
+# one instead of opening connections without bound under load.
+redis_pool = aioredis.BlockingConnectionPool.from_url(
+    Config.REDIS_URL + '/0',
+    max_connections=Config.REDIS_MAX_CONNECTIONS,
+    timeout=Config.REDIS_POOL_TIMEOUT,
+    socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+    socket_connect_timeout=Config.REDIS_SOCKET_TIMEOUT,
+    health_check_interval=30,
+)
+
+
+
+class TimedPipeline(aioredis.client.Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_COMMAND_DURATION.labels("PIPELINE").observe(time.perf_counter() - start)
+
+
+class TimedRedis(aioredis.Redis):
+    """Redis client recording the latency of each command it sends
+
+    A pipeline is timed as a whole under the command name PIPELINE.
+    """
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_DURATION.labels(str(args[0]).upper()).observe(
+                time.perf_counter() - start
+            )
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> TimedPipeline:
+        return TimedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+token_logout = TimedRedis(connection_pool=redis_pool)
+
+# Moves the owner of a refresh id to a new id. Running it server-side makes
+# the check-and-rotate atomic, so of two concurrent refreshes with the same
+# id only one succeeds.
+ROTATE_REFRESH_ID = """
+local owner = redis.call('GET', KEYS[1])
+if not owner then
+    return false
+end
+redis.call('DEL', KEYS[1])
+redis.call('SET', KEYS[2], owner, 'EX', ARGV[1])
+return owner
+"""
+
+rotate_refresh_id_script = token_logout.register_script(ROTATE_REFRESH_ID)
 
 async def add_jti_to_logout(jti: str, value: str, ex: int = JTI_EXPIRY) -> None:
     await token_logout.set(name=jti, value=value, ex=ex)
@@ -14,6 +81,43 @@ async def remove_jti_from_logout(jti:str) -> None:
     await token_logout.delete(jti)
 
 
+async def rotate_refresh_id(
+    refresh_id: str, new_refresh_id: str, ex: int = JTI_EXPIRY
+) -> str | None:
+    owner = await rotate_refresh_id_script(
+        keys=[refresh_id, new_refresh_id], args=[ex], client=token_logout
+    )
+
+    return owner.decode('utf-8') if owner else None
+
+
+async def revoke_access_jti(
+    jti: str, ex: int, refresh_id: str | None = None
+) -> None:
+    async with token_logout.pipeline(transaction=True) as pipe:
+        if refresh_id:
+            pipe.delete(refresh_id)
+        pipe.set(name=jti, value="Invalid", ex=ex)
+        pipe.zadd(REVOKED_JTI_SET, {jti: time.time() + ex})
+        pipe.publish(REVOKED_JTI_CHANNEL, jti)
+        await pipe.execute()
+
+
+def subscribe_revoked_jtis() -> aioredis.client.PubSub:
+    return token_logout.pubsub(ignore_subscribe_messages=True)
+
+
+async def get_revoked_jtis() -> list[str]:
+    now = time.time()
+
+    async with token_logout.pipeline(transaction=True) as pipe:
+        pipe.zremrangebyscore(REVOKED_JTI_SET, "-inf", now)
+        pipe.zrangebyscore(REVOKED_JTI_SET, now, "+inf")
+        _, jtis = await pipe.execute()
+
+    return [jti.decode("utf-8") for jti in jtis]
+
+
 async def token_in_logout(jti: str) -> bool:
     if not jti:
         return None
@@ -0,0 +1,50 @@
+"""Per-tag book counts kept in `tags.book_count`
+
+Triggers on `booktag` adjust the counter on every link added or removed,
+so it stays right for ORM writes and set-based INSERT ... SELECT alike.
+The same statements are run by migration e7b3c1d8f254 and, for
+`create_all`, by `register`. RECOUNT_TAGS recomputes every counter from
+`booktag` if they are ever in doubt.
+"""
+from sqlalchemy import DDL, event
+
+CREATE_TAG_COUNT_TRIGGERS = (
+    """
+    CREATE TRIGGER booktag_count_ai AFTER INSERT ON booktag BEGIN
+        UPDATE tags SET book_count = book_count + 1 WHERE uid = new.tag_id;
+    END
+    """,
+    """
+    CREATE TRIGGER booktag_count_ad AFTER DELETE ON booktag BEGIN
+        UPDATE tags SET book_count = book_count - 1 WHERE uid = old.tag_id;
+    END
+    """,
+    """
+    CREATE TRIGGER booktag_count_au AFTER UPDATE OF tag_id ON booktag BEGIN
+        UPDATE tags SET book_count = book_count - 1 WHERE uid = old.tag_id;
+        UPDATE tags SET book_count = book_count + 1 WHERE uid = new.tag_id;
+    END
+    """,
+)
+
+DROP_TAG_COUNT_TRIGGERS = (
+    "DROP TRIGGER IF EXISTS booktag_count_au",
+    "DROP TRIGGER IF EXISTS booktag_count_ad",
+    "DROP TRIGGER IF EXISTS booktag_count_ai",
+)
+
+RECOUNT_TAGS = """
+    UPDATE tags SET book_count = (
+        SELECT count(*) FROM booktag WHERE booktag.tag_id = tags.uid
+    )
+"""
+
+
+def register(booktag_table) -> None:
+    """Create and drop the triggers together with `booktag_table` in create_all"""
+
+    for statement in CREATE_TAG_COUNT_TRIGGERS:
+        event.listen(booktag_table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+    for statement in DROP_TAG_COUNT_TRIGGERS:
+        event.listen(booktag_table, "before_drop", DDL(statement).execute_if(dialect="sqlite"))
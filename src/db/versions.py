@@ -0,0 +1,69 @@
+"""Row versions behind the ETags of books, tags and reviews
+
+Every UPDATE of a versioned row bumps its `version`, and also its
+`update_at` unless the statement set that itself. A book's detail embeds
+its tags, so linking or unlinking a tag, and renaming or deleting one,
+touches the books concerned too. The same statements are run by migration
+f4a9d2b6c831 and, for `create_all`, by `register`.
+"""
+from sqlalchemy import DDL, event
+
+# the format SQLAlchemy stores naive datetimes in, from SQLite's clock
+NOW = "strftime('%Y-%m-%d %H:%M:%f000', 'now', 'localtime')"
+
+
+def _bump(table: str) -> str:
+    return f"""
+    CREATE TRIGGER {table}_version_au AFTER UPDATE ON {table}
+    WHEN new.version = old.version BEGIN
+        UPDATE {table} SET
+            version = old.version + 1,
+            update_at = CASE WHEN new.update_at IS old.update_at THEN {NOW} ELSE new.update_at END
+        WHERE rowid = new.rowid;
+    END
+    """
+
+
+TRIGGERS = {
+    "books": {"books_version_au": _bump("books")},
+    "reviews": {"reviews_version_au": _bump("reviews")},
+    "tags": {
+        "tags_version_au": _bump("tags"),
+        "tags_touch_books_au": f"""
+        CREATE TRIGGER tags_touch_books_au AFTER UPDATE OF name ON tags BEGIN
+            UPDATE books SET update_at = {NOW}
+            WHERE uid IN (SELECT book_id FROM booktag WHERE tag_id = new.uid);
+        END
+        """,
+        "tags_touch_books_ad": f"""
+        CREATE TRIGGER tags_touch_books_ad AFTER DELETE ON tags BEGIN
+            UPDATE books SET update_at = {NOW}
+            WHERE uid IN (SELECT book_id FROM booktag WHERE tag_id = old.uid);
+        END
+        """,
+    },
+    "booktag": {
+        "booktag_touch_book_ai": f"""
+        CREATE TRIGGER booktag_touch_book_ai AFTER INSERT ON booktag BEGIN
+            UPDATE books SET update_at = {NOW} WHERE uid = new.book_id;
+        END
+        """,
+        "booktag_touch_book_ad": f"""
+        CREATE TRIGGER booktag_touch_book_ad AFTER DELETE ON booktag BEGIN
+            UPDATE books SET update_at = {NOW} WHERE uid = old.book_id;
+        END
+        """,
+    },
+}
+
+
+def register(table) -> None:
+    """Create and drop the triggers on `table` together with it in create_all"""
+
+    for name, statement in TRIGGERS[table.name].items():
+        # DDL() applies %-formatting, which would eat strftime's directives
+        create = DDL(statement.replace("%", "%%"))
+        event.listen(table, "after_create", create.execute_if(dialect="sqlite"))
+        event.listen(
+            table, "before_drop", DDL(f"DROP TRIGGER IF EXISTS {name}").execute_if(dialect="sqlite")
+        )
@@ -0,0 +1,219 @@
+import asyncio
+import contextvars
+import logging
+from typing import Awaitable, Callable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import Config
+
+from .main import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+WriteJob = Callable[[AsyncSession], Awaitable[T]]
+
+
+def _is_job_error(error: BaseException, job_task: asyncio.Task | None) -> bool:
+    """Whether `error` only fails its job, rather than stopping the worker
+
+    A CancelledError is the job's own when the job's task ended cancelled.
+    Raised while the job is still running, or around it, it means the
+    worker itself is being cancelled.
+    """
+
+    if isinstance(error, asyncio.CancelledError):
+        return job_task is not None and job_task.cancelled()
+
+    return isinstance(error, Exception)
+
+
+def _fail_pending(items, error: BaseException) -> None:
+    for _, future, _ in items:
+        if not future.done():
+            future.set_exception(error)
+
+
+def _drain(queue: asyncio.Queue) -> list:
+    items = []
+
+    while not queue.empty():
+        items.append(queue.get_nowait())
+
+    return items
+
+
+class WriteQueue:
+    """Runs every database write on the single writer connection, in order
+
+    SQLite allows one writer at a time; letting request handlers commit on
+    their own connections makes them fight over the write lock and fail
+    with "database is locked" under load. Instead, handlers submit a job
+    (an async function taking a session) and await its result. A single
+    worker task runs the jobs one after another, each in its own
+    transaction that is committed when the job returns and rolled back if
+    it raises. The job runs with the submitter's context variables.
+    Whatever a job raises, cancellation included, goes to its caller
+    only; if the worker itself stops, every job still queued fails rather
+    than waiting forever.
+
+    With `group_commit` on, jobs that arrive within `batch_window` seconds
+    of each other (up to `batch_max` of them) share one transaction and so
+    one fsync. Each job runs inside its own savepoint: a job that raises
+    only rolls back its own changes and only its caller sees the error.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        group_commit: bool = False,
+        batch_window: float = 0.002,
+        batch_max: int = 64,
+    ) -> None:
+        self.session_factory = session_factory
+        self.group_commit = group_commit
+        self.batch_window = batch_window
+        self.batch_max = batch_max
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+
+    async def submit(self, job: WriteJob) -> T:
+        loop = asyncio.get_running_loop()
+
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            queue = self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+            # whatever ends the worker, nothing left in its queue may wait forever
+            self._worker.add_done_callback(
+                lambda worker: _fail_pending(
+                    _drain(queue), RuntimeError("Write queue closed")
+                )
+            )
+
+        future = loop.create_future()
+        self._queue.put_nowait((job, future, contextvars.copy_context()))
+
+        return await future
+
+    async def close(self) -> None:
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+
+        _fail_pending(_drain(self._queue), RuntimeError("Write queue closed"))
+
+        self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+
+            try:
+                if self.group_commit:
+                    await self._fill(batch)
+
+                batch = [item for item in batch if not item[1].cancelled()]
+
+                if not batch:
+                    continue
+
+                if self.group_commit:
+                    await self._execute_batch(batch)
+                else:
+                    await self._execute(*batch[0])
+
+            except BaseException:
+                _fail_pending(batch, RuntimeError("Write queue closed"))
+                raise
+
+    async def _fill(self, batch: list) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_window
+
+        while len(batch) < self.batch_max:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    async def _execute(self, job: WriteJob, future: asyncio.Future, context) -> None:
+        job_task = None
+
+        try:
+            async with self.session_factory() as session:
+                job_task = context.run(asyncio.ensure_future, job(session))
+                result = await job_task
+                await session.commit()
+
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+
+            if not _is_job_error(e, job_task):
+                raise
+
+        else:
+            if not future.done():
+                future.set_result(result)
+
+    async def _execute_batch(self, batch: list) -> None:
+        outcomes = []
+
+        try:
+            async with self.session_factory() as session:
+                for job, future, context in batch:
+                    job_task = None
+
+                    try:
+                        async with session.begin_nested():
+                            job_task = context.run(asyncio.ensure_future, job(session))
+                            result = await job_task
+                    except BaseException as e:
+                        if not _is_job_error(e, job_task):
+                            raise
+                        outcomes.append((future, None, e))
+                    else:
+                        outcomes.append((future, result, None))
+
+                    # a later job's failed savepoint would expire the
+                    # objects this one returned; detached, they keep
+                    # the values they were flushed with
+                    session.expunge_all()
+
+                await session.commit()
+
+        except Exception as e:
+            # The commit failed, so none of the batch was written
+            outcomes = [(future, None, e) for _, future, _ in batch]
+
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+write_queue = WriteQueue(
+    async_session_maker,
+    group_commit=Config.WRITE_GROUP_COMMIT,
+    batch_window=Config.WRITE_BATCH_WINDOW_MS / 1000,
+    batch_max=Config.WRITE_BATCH_MAX,
+)
@@ -93,6 +93,30 @@ class ReviewExists(BookTrackerException):
     pass
 
 
+class PasswordHashingBusy(BookTrackerException):
+    """Every password hashing worker stayed busy for the whole queue timeout"""
+
+    pass
+
+
+class InvalidCursor(BookTrackerException):
+    """User has provided a malformed pagination cursor"""
+
+    pass
+
+
+class UnsupportedBookQuery(BookTrackerException):
+    """User has combined book filters that no index can serve"""
+
+    pass
+
+
+class UnsupportedImportFormat(BookTrackerException):
+    """User has sent a book import that is neither NDJSON nor CSV"""
+
+    pass
+
+
 def create_exception_handler(
     status_code: int, initial_detail: Any
 ) -> Callable[[Request, Exception], JSONResponse]:
@@ -253,6 +277,50 @@ def register_all_errors(app: FastAPI):
         )
     )
 
+    app.add_exception_handler(
+        InvalidCursor,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Invalid pagination cursor",
+                "error_code": "invalid_cursor",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        UnsupportedBookQuery,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Filter on at most one of author, language or publisher",
+                "error_code": "unsupported_query",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        UnsupportedImportFormat,
+        create_exception_handler(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            initial_detail={
+                "message": "Send books as application/x-ndjson or text/csv",
+                "error_code": "unsupported_import_format",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        PasswordHashingBusy,
+        create_exception_handler(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            initial_detail={
+                "message": "Server is busy, please try again shortly",
+                "error_code": "server_busy",
+            },
+        ),
+    )
+
     @app.exception_handler(500)
     async def internal_server_error(request, exc):
 
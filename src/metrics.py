@@ -0,0 +1,186 @@
+import logging
+import os
+import time
+from typing import Sequence
+
+import dramatiq
+from fastapi import FastAPI, Response
+from fastapi.params import Depends
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_HASH_QUEUE_WAIT = Histogram(
+    "booktracker_password_hash_queue_wait_seconds",
+    "Time password hashing work waited for a free hashing worker",
+)
+
+PASSWORD_HASH_DURATION = Histogram(
+    "booktracker_password_hash_seconds",
+    "Time spent hashing or verifying a password on a hashing worker",
+    ["operation"],
+)
+
+PASSWORD_HASH_REJECTED = Counter(
+    "booktracker_password_hash_rejected_total",
+    "Password hashing requests rejected because every worker stayed busy",
+)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "booktracker_http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ["method", "route", "status"],
+)
+
+DB_STATEMENT_DURATION = Histogram(
+    "booktracker_db_statement_duration_seconds",
+    "Time the database driver spent executing a SQL statement",
+    ["engine", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+REDIS_COMMAND_DURATION = Histogram(
+    "booktracker_redis_command_duration_seconds",
+    "Round trip of a Redis command or pipeline, including the wait for a pooled connection",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+TASKS_ENQUEUED = Counter(
+    "booktracker_tasks_enqueued_total",
+    "Background task messages handed to the broker",
+    ["queue", "actor"],
+)
+
+
+class MetricsMiddleware:
+    """Time every HTTP request, labelled by the route template it matched
+
+    Labelling by template (`/books/{book_uid}`) rather than by path keeps
+    one series per route instead of one per book.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # set on the scope by the router once a route matched
+            route = scope.get("route")
+
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status_code,
+            ).observe(time.perf_counter() - start)
+
+
+class TaskMetrics(dramatiq.Middleware):
+    """Count messages as they are enqueued, in whichever process sends them"""
+
+    def after_enqueue(self, broker, message, delay):
+        TASKS_ENQUEUED.labels(message.queue_name, message.actor_name).inc()
+
+
+class TaskQueueCollector(Collector):
+    """Report the depth of each broker queue when scraped
+
+    The depth lives in Redis rather than in any one process, so it is
+    read at scrape time instead of being kept as a per-process gauge.
+    """
+
+    def __init__(self, broker: dramatiq.Broker) -> None:
+        self.broker = broker
+
+    def _depth(self) -> GaugeMetricFamily:
+        return GaugeMetricFamily(
+            "booktracker_task_queue_depth",
+            "Messages waiting, delayed or in flight on a background task queue",
+            labels=["queue"],
+        )
+
+    def describe(self):
+        # without this, registering the collector would call collect(),
+        # and with it Redis, at import time
+        yield self._depth()
+
+    def collect(self):
+        depth = self._depth()
+
+        for queue_name in sorted(self.broker.get_declared_queues()):
+            try:
+                size = self.broker.do_qsize(queue_name)
+            except RedisError as e:
+                logger.warning("Could not read the size of queue %s: %s", queue_name, e)
+                continue
+
+            depth.add_metric([queue_name], size)
+
+        yield depth
+
+
+def metrics_registry(*collectors: Collector) -> CollectorRegistry:
+    """The registry to expose, aggregated across processes in multiprocess mode
+
+    With PROMETHEUS_MULTIPROC_DIR set (before this module is imported),
+    every worker process writes its samples to files in that directory
+    and a scrape of any one worker reads all of them.
+    """
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    for collector in collectors:
+        registry.register(collector)
+
+    return registry
+
+
+def register_metrics(
+    app: FastAPI, broker: dramatiq.Broker, dependencies: Sequence[Depends] = ()
+) -> None:
+    """Serve the metrics at `/metrics`, guarded by `dependencies`
+
+    The route shares the public app's port, so the caller passes the
+    dependencies that keep route names, traffic and queue depths from
+    being readable by anyone who can reach the API.
+    """
+
+    registry = metrics_registry(TaskQueueCollector(broker))
+
+    # a plain def, so FastAPI runs it on a worker thread: reading queue
+    # depths is a blocking Redis call
+    @app.get("/metrics", include_in_schema=False, dependencies=list(dependencies))
+    def metrics() -> Response:
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
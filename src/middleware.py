@@ -1,28 +1,31 @@
 from fastapi import FastAPI
-from fastapi.requests import Request
-from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-import time
 import logging
 
+from .access_log import AccessLogMiddleware
+from .config import Config
+from .db.main import async_engine, read_engine
+from .metrics import MetricsMiddleware
+from .profiling import SqlProfilingMiddleware, profile_engine
+
+# replaced by the JSON access log in src/access_log.py
 logger = logging.getLogger("uvicorn.access")
 logger.disabled = True
 
 
 def register_middleware(app: FastAPI):
 
-    @app.middleware("http")
-    async def custom_logging(request: Request, call_next):
-        start_time = time.time()
+    if Config.SQL_PROFILING:
+        app.add_middleware(SqlProfilingMiddleware)
 
-        response = await call_next(request)
-        processing_time = time.time() - start_time
+        # in-memory databases share one engine for reads and writes
+        for engine in {async_engine, read_engine}:
+            profile_engine(engine)
 
-        message = f"{request.client.host}:{request.client.port} - {request.method} - {request.url.path} - {response.status_code} completed after {processing_time}s"
+    app.add_middleware(MetricsMiddleware)
 
-        print(message)
-        return response
+    app.add_middleware(AccessLogMiddleware)
 
     app.add_middleware(
         CORSMiddleware,
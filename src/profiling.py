@@ -0,0 +1,123 @@
+"""Opt-in per-request SQL profiling
+
+With SQL_PROFILING on, every statement the engines execute is counted and
+timed against the request that caused it, found through a context
+variable. Writes are included, since the write queue runs each job with
+its submitter's context. The totals go out in a `Server-Timing` header.
+A request that runs one statement, after normalizing away its
+parameters, more than `repeat_threshold` times is logged as a likely N+1
+query. Statements slower than SQL_SLOW_QUERY_MS go to the
+"booktracker.sql.slow" logger, whether or not a request is being
+profiled.
+
+Only statements that run before the response starts are counted in the
+header; a streamed body's queries still reach the logs.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import Config
+
+logger = logging.getLogger("booktracker.sql")
+slow_query_logger = logging.getLogger("booktracker.sql.slow")
+
+_WHITESPACE = re.compile(r"\s+")
+# an expanded IN list, whose length follows the number of values
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def normalize_statement(statement: str) -> str:
+    """The statement with literals, parameter lists and spacing made uniform"""
+
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _LITERAL.sub("?", statement)
+
+    return _PARAMETER_LIST.sub("(?)", statement)
+
+
+class QueryProfile:
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[normalize_statement(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count > threshold
+        ]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.3f};desc="{self.count} queries"'
+
+
+current_profile: ContextVar[QueryProfile | None] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def profile_engine(engine: AsyncEngine, slow_ms: float = Config.SQL_SLOW_QUERY_MS) -> None:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._profile_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - context._profile_started
+        profile = current_profile.get()
+
+        if profile is not None:
+            profile.record(statement, duration)
+
+        if duration * 1000 >= slow_ms:
+            # parameters stay out of the log: they may hold credentials
+            slow_query_logger.warning(
+                "Slow query (%.1f ms): %s", duration * 1000, _WHITESPACE.sub(" ", statement)
+            )
+
+
+class SqlProfilingMiddleware:
+    def __init__(self, app, repeat_threshold: int = Config.SQL_REPEAT_THRESHOLD) -> None:
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", profile.server_timing().encode()),
+                ]
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+
+            for statement, count in profile.repeated(self.repeat_threshold):
+                logger.warning(
+                    "Possible N+1: %s %s ran the same statement %d times: %s",
+                    scope["method"], scope["path"], count, statement,
+                )
@@ -0,0 +1,160 @@
+"""Redis cache for serialized list responses
+
+A page is stored under its route name and query parameters, together
+with the generation of each cache tag it depends on. Invalidating a tag
+only increments its generation, so every entry built before that point
+stops matching, including one still being built while the write landed.
+Reading an entry and the current generations is one pipelined round trip.
+
+An entry is fresh for `ttl` seconds and may then be served stale for
+`stale_ttl` more while one background task, elected with a Redis lock,
+rebuilds it. If Redis cannot be reached, requests bypass the cache.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Iterable, Sequence
+from urllib.parse import urlencode
+
+import redis.asyncio as aioredis  # type: ignore
+from fastapi import Response
+from redis.exceptions import RedisError
+
+from src.config import Config
+from src.db.redis import TimedRedis, redis_pool
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "response-cache"
+# a refresh that takes longer than this may be started a second time
+REFRESH_LOCK_TTL = 30
+
+Build = Callable[[], Awaitable[bytes]]
+
+
+def cached_response(body: bytes, state: str, headers: dict | None = None) -> Response:
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={**(headers or {}), "X-Cache": state},
+    )
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        redis: aioredis.Redis,
+        ttl: float = Config.RESPONSE_CACHE_TTL,
+        stale_ttl: float = Config.RESPONSE_CACHE_STALE_TTL,
+        enabled: bool = Config.RESPONSE_CACHE_ENABLED,
+    ) -> None:
+        self.redis = redis
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.enabled = enabled
+        self._refreshing: set[asyncio.Task] = set()
+
+    def key(self, name: str, params: Iterable[tuple[str, str]]) -> str:
+        return f"{PREFIX}:page:{name}:{urlencode(sorted(params))}"
+
+    def _generation_key(self, tag: str) -> str:
+        return f"{PREFIX}:tag:{tag}"
+
+    async def get_or_build(
+        self,
+        name: str,
+        params: Iterable[tuple[str, str]],
+        tags: Sequence[str],
+        build: Build,
+    ) -> tuple[bytes, str]:
+        """Return the page body and how it was served: HIT, STALE, MISS or BYPASS
+
+        `build` must not depend on the request: on a stale hit it runs in
+        the background after the response has been sent.
+        """
+
+        if not self.enabled:
+            return await build(), "BYPASS"
+
+        key = self.key(name, params)
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.hmget(key, "body", "fresh_until", "generations")
+                pipe.mget([self._generation_key(tag) for tag in tags])
+                (body, fresh_until, stored), current = await pipe.execute()
+        except RedisError:
+            logger.warning("Response cache unavailable, building %s directly", name)
+            return await build(), "BYPASS"
+
+        generations = [int(g or 0) for g in current]
+
+        if body is not None and json.loads(stored) == generations:
+            if time.time() < float(fresh_until):
+                return body, "HIT"
+
+            await self._refresh_in_background(key, generations, build)
+            return body, "STALE"
+
+        body = await build()
+        await self._store(key, generations, body)
+
+        return body, "MISS"
+
+    async def invalidate(self, *tags: str) -> None:
+        """Make every entry that depends on one of `tags` a miss"""
+
+        if not self.enabled:
+            return
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(self._generation_key(tag))
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Could not invalidate cached responses for %s", tags)
+
+    async def _store(self, key: str, generations: list[int], body: bytes) -> None:
+        now = time.time()
+
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hset(
+                    key,
+                    mapping={
+                        "body": body,
+                        "fresh_until": now + self.ttl,
+                        "generations": json.dumps(generations),
+                    },
+                )
+                pipe.expire(key, int(self.ttl + self.stale_ttl) + 1)
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Could not cache %s", key)
+
+    async def _refresh_in_background(self, key: str, generations: list[int], build: Build) -> None:
+        try:
+            elected = await self.redis.set(f"{key}:refresh", 1, nx=True, ex=REFRESH_LOCK_TTL)
+        except RedisError:
+            return
+
+        if elected:
+            task = asyncio.create_task(self._refresh(key, generations, build))
+            self._refreshing.add(task)
+            task.add_done_callback(self._refreshing.discard)
+
+    async def _refresh(self, key: str, generations: list[int], build: Build) -> None:
+        try:
+            await self._store(key, generations, await build())
+        except Exception:
+            logger.exception("Refreshing %s failed", key)
+        finally:
+            try:
+                await self.redis.delete(f"{key}:refresh")
+            except RedisError:
+                pass
+
+
+response_cache = ResponseCache(TimedRedis(connection_pool=redis_pool))
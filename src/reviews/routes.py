@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
 
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src import conditional
 from src.auth.dependencies import RoleChecker, get_current_user
-from src.db.main import get_session
-from src.db.models import User
+from src.auth.schemas import UserPrincipalModel
+from src.db.main import get_session, get_session_maker
+from src.response_cache import cached_response, response_cache
+from src.serialization import dump_json, json_response
 
-from .schemas import ReviewCreateModel
+from .schemas import ReviewCreateModel, ReviewModel
 from .service import ReviewService
 
 review_service = ReviewService()
@@ -14,32 +19,53 @@ admin_role_checker = Depends(RoleChecker(["admin"]))
 user_role_checker = Depends(RoleChecker(["user", "admin"]))
 
 
-@review_router.get("/", dependencies=[admin_role_checker])
-async def get_all_reviews(session: AsyncSession = Depends(get_session)):
-    reviews = await review_service.get_all_reviews(session)
+@review_router.get("/", response_model=List[ReviewModel], dependencies=[admin_role_checker])
+async def get_all_reviews(
+    request: Request,
+    session_maker: async_sessionmaker = Depends(get_session_maker),
+):
+    async def build() -> bytes:
+        async with session_maker() as session:
+            reviews = await review_service.get_all_reviews(session)
+
+            return dump_json(List[ReviewModel], reviews)
 
-    return reviews
+    body, state = await response_cache.get_or_build(
+        "reviews", request.query_params.multi_items(), ("reviews",), build
+    )
 
+    return cached_response(body, state)
+
+
+@review_router.get("/{review_uid}", response_model=ReviewModel, dependencies=[user_role_checker])
+async def get_review(
+    review_uid: str,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+):
+    version, update_at = await review_service.get_review_version(review_uid, session)
+
+    etag = conditional.make_etag("review", review_uid, version)
+    headers = conditional.validator_headers(etag, update_at)
+
+    if conditional.is_not_modified(request, etag, update_at):
+        return conditional.not_modified(headers)
 
-@review_router.get("/{review_uid}", dependencies=[user_role_checker])
-async def get_review(review_uid: str, session: AsyncSession = Depends(get_session)):
     review = await review_service.get_review(review_uid, session)
 
-    return review
+    return json_response(ReviewModel, review, headers=headers)
 
 
 @review_router.post("/book/{book_uid}", dependencies=[user_role_checker])
 async def add_review_to_books(
     book_uid: str,
     review_data: ReviewCreateModel,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipalModel = Depends(get_current_user),
 ):
     new_review = await review_service.add_review_to_book(
         user_email=current_user.email,
         review_data=review_data,
         book_uid=book_uid,
-        session=session,
     )
 
     return new_review
@@ -52,11 +78,10 @@ async def add_review_to_books(
 )
 async def delete_review(
     review_uid: str,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    current_user: UserPrincipalModel = Depends(get_current_user),
 ):
     await review_service.delete_review_to_from_book(
-        review_uid=review_uid, user_email=current_user.email, session=session
+        review_uid=review_uid, user_email=current_user.email
     )
 
     return {}
\ No newline at end of file
@@ -15,5 +15,5 @@ class ReviewModel(BaseModel):
 
 
 class ReviewCreateModel(BaseModel):
-    rating: int = Field(le=5)
+    rating: int = Field(ge=1, le=5)
     review_text: str
\ No newline at end of file
@@ -7,9 +7,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import and_
 
 from src.auth.service import UserService
+from src.books.aggregates import apply_review
 from src.books.service import BookService
 from src.db.models import Review
-from src.errors import ReviewNotFound, BookNotFound, UserNotFound, ReviewExists
+from src.db.writer import write_queue
+from src.response_cache import response_cache
+from src.errors import ReviewNotFound, UserNotFound, ReviewExists
 
 from .schemas import ReviewCreateModel
 
@@ -23,37 +26,52 @@ class ReviewService:
         user_email: str,
         book_uid: str,
         review_data: ReviewCreateModel,
-        session: AsyncSession,
     ):
-        book = await book_service.get_book(book_uid=book_uid, session=session)
-        user = await user_service.get_user_by_email(
-            email=user_email, session=session
-        )
-
-        statement = select(Review).where(and_(Review.user_uid == user.uid, Review.book_uid == book.uid))
-        duplicate = await session.execute(statement)
-        duplicate = duplicate.scalar_one_or_none()
-        
-        if duplicate is not None:
-            raise ReviewExists
+        async def add_review(session: AsyncSession):
+            book = await book_service.get_book(book_uid=book_uid, session=session)
+            user = await user_service.get_principal_by_email(
+                email=user_email, session=session
+            )
 
-        review_data_dict = review_data.model_dump()
+            if not user:
+                raise UserNotFound
 
-        if not book:
-            raise BookNotFound
-        
-        if not user:
-            raise UserNotFound
+            statement = select(Review).where(and_(Review.user_uid == user.uid, Review.book_uid == book.uid))
+            duplicate = await session.execute(statement)
+            duplicate = duplicate.scalar_one_or_none()
+            
+            if duplicate is not None:
+                raise ReviewExists
+
+            review_data_dict = review_data.model_dump()
 
-        new_review = Review(**review_data_dict, user=user, book=book)
+            new_review = Review(**review_data_dict, user_uid=user.uid, book_uid=book.uid)
 
-        session.add(new_review)
+            session.add(new_review)
 
-        await session.commit()
+            await apply_review(session, book.uid, new_review.rating)
 
-        return new_review
+            return new_review
+
+        review = await write_queue.submit(add_review)
+        # the book listing carries the rating aggregates
+        await response_cache.invalidate("reviews", "books")
+
+        return review
     
 
+    async def get_review_version(self, review_uid: str, session: AsyncSession):
+        """Get the (version, update_at) validators of a review, without loading it"""
+
+        statement = select(Review.version, Review.update_at).where(Review.uid == review_uid)
+
+        row = (await session.execute(statement)).first()
+
+        if row is None:
+            raise ReviewNotFound()
+
+        return row
+
     async def get_review(self, review_uid: str, session: AsyncSession):
         statement = select(Review).where(Review.uid == review_uid)
 
@@ -75,19 +93,22 @@ class ReviewService:
         return result.scalars().all()
 
 
-    async def delete_review_to_from_book(
-        self, review_uid: str, user_email: str, session: AsyncSession
-    ):
-        user = await user_service.get_user_by_email(user_email, session)
+    async def delete_review_to_from_book(self, review_uid: str, user_email: str):
+        async def delete_review(session: AsyncSession):
+            user = await user_service.get_principal_by_email(user_email, session)
 
-        review = await self.get_review(review_uid, session)
+            review = await self.get_review(review_uid, session)
 
-        if not review or (review.user != user):
-            raise HTTPException(
-                detail="Cannot delete this review",
-                status_code=status.HTTP_403_FORBIDDEN,
-            )
+            if not user or review.user_uid != user.uid:
+                raise HTTPException(
+                    detail="Cannot delete this review",
+                    status_code=status.HTTP_403_FORBIDDEN,
+                )
+
+            await session.delete(review)
 
-        await session.delete(review)
+            if review.book_uid is not None:
+                await apply_review(session, review.book_uid, review.rating, sign=-1)
 
-        await session.commit()
+        await write_queue.submit(delete_review)
+        await response_cache.invalidate("reviews", "books")
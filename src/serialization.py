@@ -0,0 +1,59 @@
+"""Fast path from ORM rows to JSON response bodies
+
+FastAPI validates a route's return value against its response_model, then
+walks the result again with jsonable_encoder before the stdlib encoder
+writes it. Here the ORM objects are validated once, by a TypeAdapter built
+once per response model, and pydantic-core writes the JSON bytes.
+
+Mapped objects are validated from their `__dict__`, the loaded state,
+rather than through attribute access: SQLAlchemy's instrumented
+descriptors cost more than the rest of serialization put together. An
+attribute that is not loaded could not be read here anyway, as lazy loads
+are not allowed in async code.
+
+Routes keep their response_model for the OpenAPI schema and return
+`json_response(...)`, which FastAPI passes through untouched.
+"""
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi import Response, status
+from pydantic import TypeAdapter
+from sqlmodel import SQLModel
+
+
+@lru_cache(maxsize=None)
+def adapter_for(model_type: Any) -> TypeAdapter:
+    return TypeAdapter(model_type)
+
+
+def _loaded(value: Any) -> Any:
+    if isinstance(value, SQLModel):
+        return value.__dict__
+    if isinstance(value, list):
+        return [_loaded(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _loaded(item) for key, item in value.items()}
+    return value
+
+
+def dump_json(model_type: Any, value: Any) -> bytes:
+    """Serialize `value` as FastAPI would for a `model_type` response_model"""
+
+    adapter = adapter_for(model_type)
+
+    return adapter.dump_json(adapter.validate_python(_loaded(value), from_attributes=True))
+
+
+def json_response(
+    model_type: Any,
+    value: Any,
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[dict] = None,
+) -> Response:
+    return Response(
+        content=dump_json(model_type, value),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
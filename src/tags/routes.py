@@ -1,14 +1,24 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 
+from src import conditional
 from src.auth.dependencies import RoleChecker
-from src.books.schemas import Book
-from src.db.main import get_session
-
-from .schemas import TagAddModel, TagCreateModel, TagModel
+from src.books.schemas import Book, BookPage
+from src.db.main import get_session, get_session_maker
+from src.db.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.response_cache import cached_response, response_cache
+from src.serialization import dump_json, json_response
+
+from .schemas import (
+    TagAddModel,
+    TagBulkAssignModel,
+    TagBulkAssignReport,
+    TagCreateModel,
+    TagModel,
+)
 from .service import TagService
 
 tags_router = APIRouter()
@@ -17,10 +27,29 @@ user_role_checker = Depends(RoleChecker(["user", "admin"]))
 
 
 @tags_router.get("/", response_model=List[TagModel], dependencies=[user_role_checker])
-async def get_all_tags(session: AsyncSession = Depends(get_session)):
-    tags = await tag_service.get_tags(session)
+async def get_all_tags(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    session_maker: async_sessionmaker = Depends(get_session_maker),
+):
+    count, versions, update_at = await tag_service.get_tags_version(session)
+
+    etag = conditional.make_etag("tags", count, versions, update_at)
+    headers = conditional.validator_headers(etag, update_at)
+
+    if conditional.is_not_modified(request, etag, update_at):
+        return conditional.not_modified(headers)
+
+    async def build() -> bytes:
+        async with session_maker() as session:
+            tags = await tag_service.get_tags(session)
 
-    return tags
+            return dump_json(List[TagModel], tags)
+
+    # keyed by the ETag too, so a stale body never goes out under a newer one
+    body, state = await response_cache.get_or_build("tags", [("etag", etag)], ("tags",), build)
+
+    return cached_response(body, state, headers)
 
 
 @tags_router.post(
@@ -29,27 +58,49 @@ async def get_all_tags(session: AsyncSession = Depends(get_session)):
     status_code=status.HTTP_201_CREATED,
     dependencies=[user_role_checker],
 )
-async def add_tag(
-    tag_data: TagCreateModel, session: AsyncSession = Depends(get_session)
-) -> TagModel:
+async def add_tag(tag_data: TagCreateModel) -> TagModel:
 
-    tag_added = await tag_service.add_tag(tag_data=tag_data, session=session)
+    tag_added = await tag_service.add_tag(tag_data=tag_data)
 
-    return tag_added
+    return json_response(TagModel, tag_added, status.HTTP_201_CREATED)
 
 
 @tags_router.post(
     "/book/{book_uid}/tags", response_model=Book, dependencies=[user_role_checker]
 )
-async def add_tags_to_book(
-    book_uid: str, tag_data: TagAddModel, session: AsyncSession = Depends(get_session)
-) -> Book:
+async def add_tags_to_book(book_uid: str, tag_data: TagAddModel) -> Book:
 
     book_with_tag = await tag_service.add_tags_to_book(
-        book_uid=book_uid, tag_data=tag_data, session=session
+        book_uid=book_uid, tag_data=tag_data
     )
 
-    return book_with_tag
+    return json_response(Book, book_with_tag)
+
+
+@tags_router.post(
+    "/bulk-assign",
+    response_model=TagBulkAssignReport,
+    dependencies=[user_role_checker],
+)
+async def bulk_assign_tags(assign_data: TagBulkAssignModel) -> TagBulkAssignReport:
+
+    report = await tag_service.bulk_assign(assign_data)
+
+    return report
+
+
+@tags_router.get(
+    "/{tag_uid}/books", response_model=BookPage, dependencies=[user_role_checker]
+)
+async def get_tag_books(
+    tag_uid: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_session),
+):
+    books = await tag_service.get_tag_books(tag_uid, session, cursor, limit)
+
+    return json_response(BookPage, books)
 
 
 @tags_router.put(
@@ -58,11 +109,10 @@ async def add_tags_to_book(
 async def update_tag(
     tag_uid: str,
     tag_update_data: TagCreateModel,
-    session: AsyncSession = Depends(get_session),
 ) -> TagModel:
-    updated_tag = await tag_service.update_tag(tag_uid, tag_update_data, session)
+    updated_tag = await tag_service.update_tag(tag_uid, tag_update_data)
 
-    return updated_tag
+    return json_response(TagModel, updated_tag)
 
 
 @tags_router.delete(
@@ -70,9 +120,7 @@ async def update_tag(
     status_code=status.HTTP_204_NO_CONTENT,
     dependencies=[user_role_checker],
 )
-async def delete_tag(
-    tag_uid: str, session: AsyncSession = Depends(get_session)
-) -> None:
-    updated_tag = await tag_service.delete_tag(tag_uid, session)
+async def delete_tag(tag_uid: str) -> None:
+    updated_tag = await tag_service.delete_tag(tag_uid)
 
     return updated_tag
\ No newline at end of file
@@ -2,12 +2,13 @@ import uuid
 from datetime import datetime
 from typing import List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class TagModel(BaseModel):
     uid: str
     name: str
+    book_count: int = 0
     created_at: datetime
 
 
@@ -16,4 +17,14 @@ class TagCreateModel(BaseModel):
 
 
 class TagAddModel(BaseModel):
-    tags: List[TagCreateModel]
\ No newline at end of file
+    tags: List[TagCreateModel]
+
+class TagBulkAssignModel(BaseModel):
+    book_uids: List[str] = Field(min_length=1)
+    tags: List[TagCreateModel] = Field(min_length=1)
+
+
+class TagBulkAssignReport(BaseModel):
+    created: int
+    skipped: int
+    missing_books: int
@@ -1,16 +1,29 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
 from fastapi import status
 from fastapi.exceptions import HTTPException
 from sqlmodel import desc, select
+from sqlalchemy import func, literal, true
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.books.service import BookService
-from src.db.models import Tag
+from src.db.models import Book, BookTag, Tag
+from src.db.pagination import DEFAULT_PAGE_SIZE, keyset_page
+from src.db.writer import write_queue
+from src.response_cache import response_cache
 
-from .schemas import TagAddModel, TagCreateModel
-from src.errors import BookNotFound, TagNotFound, TagAlreadyExists
+from .schemas import TagAddModel, TagBulkAssignModel, TagCreateModel
+from src.errors import TagNotFound, TagAlreadyExists
 
 book_service = BookService()
 
+# book uids linked per INSERT ... SELECT in bulk_assign
+BULK_ASSIGN_CHUNK_SIZE = 500
+
 
 server_error = HTTPException(
     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Something went wrong"
@@ -28,33 +41,144 @@ class TagService:
 
         return result.scalars().all()
 
-    async def add_tags_to_book(
-        self, book_uid: str, tag_data: TagAddModel, session: AsyncSession
-    ):
-        """Add tags to a book"""
+    async def get_tags_version(self, session: AsyncSession):
+        """Get the (count, version sum, latest update_at) validators of the tag list"""
 
-        book = await book_service.get_book(book_uid=book_uid, session=session)
+        statement = select(
+            func.count(), func.coalesce(func.sum(Tag.version), 0), func.max(Tag.update_at)
+        ).select_from(Tag)
 
-        if not book:
-            raise BookNotFound()
+        return (await session.execute(statement)).one()
 
-        for tag_item in tag_data.tags:
-            result = await session.execute(select(Tag).where(Tag.name == tag_item.name))
+    async def add_tags_to_book(self, book_uid: str, tag_data: TagAddModel):
+        """Add tags to a book, creating the ones that do not exist yet
 
-            tag = result.scalars().one_or_none()
-            if not tag:
-                tag = Tag(name=tag_item.name)
+        Runs the same four statements however many tags are given: the
+        book check, one upsert for the tags, one INSERT ... SELECT that
+        resolves every name and links it, and a refresh of the book's
+        version and update_at, which the link trigger bumped.
+        """
 
-            book.tags.append(tag)
+        names = list(dict.fromkeys(tag.name for tag in tag_data.tags))
 
-        session.add(book)
+        async def add_tags(session: AsyncSession):
+            book = await book_service.get_book(book_uid, session)
 
-        await session.commit()
+            if names:
+                await self._upsert_tags(session, names)
 
-        await session.refresh(book)
+                await session.execute(
+                    insert(BookTag)
+                    .from_select(
+                        ["book_id", "tag_id"],
+                        select(literal(book_uid), Tag.uid).where(Tag.name.in_(names)),
+                    )
+                    .on_conflict_do_nothing()
+                )
+
+                await session.refresh(book, ["version", "update_at"])
+
+            return book
+
+        book = await write_queue.submit(add_tags)
+        # the link triggers bump the versions of the books involved
+        await response_cache.invalidate("tags", "books")
 
         return book
 
+    async def bulk_assign(self, assign_data: TagBulkAssignModel):
+        """Link every given tag to every given book in one transaction
+
+        One tag upsert, then two statements per chunk of book uids: the
+        INSERT ... SELECT of the links and a count of the books found.
+        Links that already exist count as skipped, unknown book uids as
+        missing_books.
+        """
+
+        book_uids = list(dict.fromkeys(assign_data.book_uids))
+        names = list(dict.fromkeys(tag.name for tag in assign_data.tags))
+
+        async def assign(session: AsyncSession):
+            await self._upsert_tags(session, names)
+
+            created = found = 0
+
+            for start in range(0, len(book_uids), BULK_ASSIGN_CHUNK_SIZE):
+                chunk = book_uids[start : start + BULK_ASSIGN_CHUNK_SIZE]
+
+                result = await session.execute(
+                    insert(BookTag)
+                    .from_select(
+                        ["book_id", "tag_id"],
+                        select(Book.uid, Tag.uid)
+                        .join_from(Book, Tag, true())
+                        .where(Book.uid.in_(chunk), Tag.name.in_(names)),
+                    )
+                    .on_conflict_do_nothing()
+                )
+                created += result.rowcount
+
+                found += await session.scalar(
+                    select(func.count()).select_from(Book).where(Book.uid.in_(chunk))
+                )
+
+            return {
+                "created": created,
+                "skipped": found * len(names) - created,
+                "missing_books": len(book_uids) - found,
+            }
+
+        report = await write_queue.submit(assign)
+        await response_cache.invalidate("tags", "books")
+
+        return report
+
+    async def _upsert_tags(self, session: AsyncSession, names):
+        now = datetime.now()
+
+        await session.execute(
+            insert(Tag)
+            .values([
+                {"uid": str(uuid.uuid4()), "name": name, "created_at": now}
+                for name in names
+            ])
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+
+    async def get_tag_books(
+        self,
+        tag_uid: str,
+        session: AsyncSession,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ):
+        """Get a page of the books carrying a tag, ordered by book uid
+
+        Pages walk ix_booktag_tag_id_book_id, so the sort key is the link's
+        book_id rather than books.uid, which would need a temp b-tree.
+        """
+
+        tag = await self.get_tag_by_uid(tag_uid, session)
+
+        if not tag:
+            raise TagNotFound()
+
+        statement = (
+            select(Book)
+            .join(BookTag, BookTag.book_id == Book.uid)
+            .where(BookTag.tag_id == tag_uid)
+        )
+
+        return await keyset_page(
+            session,
+            statement,
+            (BookTag.book_id,),
+            cursor,
+            limit,
+            descending=False,
+            attrs=("uid",),
+        )
+
     async def get_tag_by_uid(self, tag_uid: str, session: AsyncSession):
         """Get tag by uid"""
 
@@ -64,54 +188,70 @@ class TagService:
 
         return result.scalars().first()  
 
-    async def add_tag(self, tag_data: TagCreateModel, session: AsyncSession):
+    async def add_tag(self, tag_data: TagCreateModel):
         """Create a tag"""
 
-        statement = select(Tag).where(Tag.name == tag_data.name)
+        async def add(session: AsyncSession):
+            statement = select(Tag).where(Tag.name == tag_data.name)
 
-        result = await session.execute(statement)
+            result = await session.execute(statement)
 
-        tag = result.scalars().first()  
+            tag = result.scalars().first()  
 
-        if tag:
-            raise TagAlreadyExists()
-        new_tag = Tag(name=tag_data.name)
+            if tag:
+                raise TagAlreadyExists()
+            new_tag = Tag(name=tag_data.name)
 
-        session.add(new_tag)
+            session.add(new_tag)
 
-        await session.commit()
+            return new_tag
 
-        return new_tag
+        tag = await write_queue.submit(add)
+        await response_cache.invalidate("tags")
 
-    async def update_tag(
-        self, tag_uid, tag_update_data: TagCreateModel, session: AsyncSession
-    ):
+        return tag
+
+    async def update_tag(self, tag_uid, tag_update_data: TagCreateModel):
         """Update a tag"""
 
-        tag = await self.get_tag_by_uid(tag_uid, session)
+        async def update(session: AsyncSession):
+            tag = await self.get_tag_by_uid(tag_uid, session)
 
-        if not tag:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+            if not tag:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+            update_data_dict = tag_update_data.model_dump()
+
+            for k, v in update_data_dict.items():
+                setattr(tag, k, v)
+
+            tag.update_at = datetime.now()
+            
+            session.add(tag)
 
-        update_data_dict = tag_update_data.model_dump()
+            try:
+                await session.flush()
+            except IntegrityError:
+                raise TagAlreadyExists()
 
-        for k, v in update_data_dict.items():
-            setattr(tag, k, v)
-        
-        session.add(tag)
+            return tag
 
-        await session.commit()
+        tag = await write_queue.submit(update)
+        # the tag triggers touch every book carrying it
+        await response_cache.invalidate("tags", "books")
 
         return tag
 
-    async def delete_tag(self, tag_uid: str, session: AsyncSession):
+    async def delete_tag(self, tag_uid: str):
         """Delete a tag"""
 
-        tag = await self.get_tag_by_uid(tag_uid,session)
+        async def delete(session: AsyncSession):
+            tag = await self.get_tag_by_uid(tag_uid,session)
 
-        if not tag:
-            raise TagNotFound()
+            if not tag:
+                raise TagNotFound()
 
-        await session.delete(tag)
+            await session.delete(tag)
 
-        await session.commit()
\ No newline at end of file
+        await write_queue.submit(delete)
+        await response_cache.invalidate("tags", "books")
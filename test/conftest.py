@@ -2,10 +2,14 @@ import pytest
 import pytest_asyncio
 from fastapi.testclient import TestClient
 from fakeredis import FakeAsyncRedis
-
-from src.db.main import get_session
-from src.auth.dependencies import get_current_user
-from src.books.routes import access_token_bearer
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+
+from src.db.main import get_session, get_session_maker
+from src.db.writer import write_queue
+from src.response_cache import response_cache
+from src.auth.dependencies import access_token_bearer, get_current_user
 from src import app
 from test.utils import(
     get_mock_session,
@@ -24,6 +28,64 @@ def test_session():
     yield mock_session
 
 
+@pytest_asyncio.fixture
+async def db_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    yield engine
+
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db_session(db_engine):
+    async with AsyncSession(db_engine, expire_on_commit=False) as session:
+        yield session
+
+
+@pytest_asyncio.fixture
+async def response_cache_redis(monkeypatch):
+    async with FakeAsyncRedis() as client:
+        monkeypatch.setattr(response_cache, "redis", client)
+        yield client
+
+
+@pytest_asyncio.fixture
+async def db_writer(db_engine, response_cache_redis, monkeypatch):
+    # writes invalidate cached responses, so they get a Redis to do it in
+    monkeypatch.setattr(
+        write_queue, "session_factory",
+        async_sessionmaker(db_engine, expire_on_commit=False),
+    )
+
+    yield write_queue
+
+    await write_queue.close()
+
+
+@pytest_asyncio.fixture
+async def db_client(db_engine, db_writer):
+    session_factory = async_sessionmaker(db_engine, expire_on_commit=False)
+
+    async def get_db_session():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_db_session
+    app.dependency_overrides[get_session_maker] = lambda: session_factory
+    app.dependency_overrides[get_current_user] = mock_user
+    app.dependency_overrides[access_token_bearer] = mock_token
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        yield client
+
+    app.dependency_overrides.clear()
+
+
 @pytest_asyncio.fixture
 async def redis_client():
     async with FakeAsyncRedis() as client:
@@ -0,0 +1,42 @@
+import io
+import json
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+
+from src.access_log import AccessLogMiddleware, configure_access_log
+
+
+@pytest.mark.asyncio
+async def test_access_log_writes_sampled_json_lines_off_the_loop():
+    app = FastAPI()
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    @app.get("/boom")
+    async def boom():
+        raise HTTPException(status_code=503)
+
+    # sample nothing: only the server error gets through
+    app.add_middleware(AccessLogMiddleware, sample_rate=0.0, slow_ms=60_000)
+
+    stream = io.StringIO()
+    listener = configure_access_log(stream)
+    listener.start()
+
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://testserver") as client:
+            await client.get("/ok")
+            await client.get("/boom")
+    finally:
+        listener.stop()
+
+    [line] = stream.getvalue().splitlines()
+    entry = json.loads(line)
+
+    assert entry["event"] == "request" and entry["logger"] == "booktracker.access"
+    assert (entry["method"], entry["path"], entry["status"]) == ("GET", "/boom", 503)
+    assert entry["duration_ms"] >= 0 and entry["bytes"] > 0
@@ -0,0 +1,102 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import update
+
+from src.books.aggregates import verify_aggregates
+from src.books.service import BookService
+from src.db.models import Book, Review, User
+from src.reviews.schemas import ReviewCreateModel
+from src.reviews.service import ReviewService
+from test.utils import seed_books
+
+book_service = BookService()
+review_service = ReviewService()
+
+
+async def seed_users(session, count):
+    users = [
+        User(
+            username=f"user{i}",
+            email=f"user{i}@example.com",
+            first_name="first",
+            last_name="last",
+            role="user",
+            password_hash="x",
+        )
+        for i in range(count)
+    ]
+    session.add_all(users)
+    await session.commit()
+    return users
+
+
+@pytest.mark.asyncio
+async def test_reviews_maintain_book_aggregates(db_session, db_writer):
+    (book,) = await seed_books(db_session, 1)
+    users = await seed_users(db_session, 3)
+
+    reviews = [
+        await review_service.add_review_to_book(
+            user.email, book.uid, ReviewCreateModel(rating=rating, review_text="text")
+        )
+        for user, rating in zip(users, (5, 4, 4))
+    ]
+    await review_service.delete_review_to_from_book(reviews[0].uid, users[0].email)
+
+    await db_session.refresh(book)
+
+    assert (book.review_count, book.rating_sum) == (2, 8)
+    assert [book.rating_1, book.rating_2, book.rating_3, book.rating_4, book.rating_5] == [
+        0, 0, 0, 2, 0,
+    ]
+    assert await verify_aggregates(db_session, fix=False) == []
+
+
+@pytest.mark.asyncio
+async def test_verify_aggregates_repairs_drift(db_session, db_writer):
+    books = await seed_books(db_session, 3)
+    (user,) = await seed_users(db_session, 1)
+
+    await review_service.add_review_to_book(
+        user.email, books[0].uid, ReviewCreateModel(rating=3, review_text="text")
+    )
+    await db_session.execute(
+        update(Book)
+        .where(Book.uid.in_([books[0].uid, books[1].uid]))
+        .values(review_count=7, rating_3=0)
+    )
+    await db_session.commit()
+
+    drifted = await verify_aggregates(db_session)
+
+    assert {row["uid"]: row["review_count"] for row in drifted} == {
+        books[0].uid: 1,
+        books[1].uid: 0,
+    }
+    assert await verify_aggregates(db_session, fix=False) == []
+
+    await db_session.refresh(books[0])
+    assert (books[0].review_count, books[0].rating_sum, books[0].rating_3) == (1, 3, 1)
+
+
+def test_rating_must_be_one_to_five():
+    with pytest.raises(ValidationError):
+        ReviewCreateModel(rating=0, review_text="text")
+
+
+@pytest.mark.asyncio
+async def test_deleting_an_out_of_range_review(db_session, db_writer):
+    (book,) = await seed_books(db_session, 1)
+    (user,) = await seed_users(db_session, 1)
+
+    # the old schema accepted any rating up to 5
+    review = Review(rating=0, review_text="text", user_uid=user.uid, book_uid=book.uid)
+    db_session.add(review)
+    await db_session.commit()
+    await verify_aggregates(db_session)
+
+    await review_service.delete_review_to_from_book(review.uid, user.email)
+
+    await db_session.refresh(book)
+    assert (book.review_count, book.rating_sum) == (0, 0)
+    assert await verify_aggregates(db_session, fix=False) == []
@@ -1,7 +1,16 @@
+import asyncio
+
 import pytest
 from unittest.mock import patch
 
 from src import version_prefix
+from src.auth.utils import (
+    create_access_token,
+    generate_passwd_hash_async,
+    verify_password_async,
+)
+from src.config import Config
+from src.errors import PasswordHashingBusy
 
 auth_prefix = f"{version_prefix}/auth"
 
@@ -44,7 +53,11 @@ def test_login_fail_invalid_password(mock_get_user, test_client, test_user, test
     assert mock_get_user.called_once_with(login_data["email"], test_session)
 
 
-def test_user_verified(test_verified_client):
+@patch("src.auth.service.UserService.get_user_profile")
+def test_user_verified(mock_get_profile, test_verified_client, test_user):
+
+    mock_get_profile.return_value = test_user
+
     response = test_verified_client.get(f"{auth_prefix}/me", headers={"Authorization": "Bearer " + 'fake.jwt'})
     assert response.status_code == 200
     result = response.json()
@@ -66,3 +79,47 @@ async def test_send_mail(test_client):
         mock_send_email.assert_called_once_with(
             ["test@example.com"], "Welcome to our app", "<h1>Welcome to the app</h1>"
         )
+
+
+@patch("src.books.service.BookService.get_all_books")
+@patch("src.auth.service.UserService.get_principal_by_email")
+@patch("src.auth.revocation.token_in_logout")
+def test_auth_context_computed_once_per_request(
+    mock_token_in_logout, mock_get_principal, mock_get_all_books, test_client, test_user
+):
+    mock_token_in_logout.return_value = None
+    mock_get_principal.return_value = test_user
+    mock_get_all_books.return_value = {"items": [], "next_cursor": None}
+
+    access_token = create_access_token(
+        user_data={"email": test_user.email, "user_uid": test_user.uid, "role": test_user.role},
+        jti="test-jti",
+    )
+
+    response = test_client.get(
+        f"{version_prefix}/books/", headers={"Authorization": f"Bearer {access_token}"}
+    )
+
+    assert response.status_code == 200
+    mock_token_in_logout.assert_awaited_once_with("test-jti")
+    mock_get_principal.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_runs_off_the_event_loop():
+    passwd_hash = await generate_passwd_hash_async("secret")
+
+    assert await verify_password_async("secret", passwd_hash)
+    assert not await verify_password_async("wrong", passwd_hash)
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_rejects_when_saturated(monkeypatch):
+    monkeypatch.setattr(Config, "PASSWORD_HASH_QUEUE_TIMEOUT", 0.01)
+    slots = asyncio.Semaphore(1)
+    monkeypatch.setattr("src.auth.utils.password_slots", slots)
+
+    await slots.acquire()
+
+    with pytest.raises(PasswordHashingBusy):
+        await generate_passwd_hash_async("secret")
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+
+import pytest
+
+from src import version_prefix
+from src.books import service as book_service_module
+from test.utils import seed_books
+
+
+def parse_ndjson(text: str) -> list:
+    return [json.loads(line) for line in text.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_streams_every_book_in_order(db_client, db_session, monkeypatch):
+    monkeypatch.setattr(book_service_module, "EXPORT_CHUNK_SIZE", 2)
+    await seed_books(db_session, 5)
+
+    response = await db_client.get(f"{version_prefix}/books/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    books = parse_ndjson(response.text)
+    assert len(books) == 5
+    assert [(b["created_at"], b["uid"]) for b in books] == sorted(
+        (b["created_at"], b["uid"]) for b in books
+    )
+    assert {"title", "author", "rating_avg"} <= set(books[0])
+
+
+@pytest.mark.asyncio
+async def test_export_resumes_after_a_book(db_client, db_session):
+    await seed_books(db_session, 5)
+    full = parse_ndjson((await db_client.get(f"{version_prefix}/books/export")).text)
+
+    response = await db_client.get(
+        f"{version_prefix}/books/export", params={"after": full[1]["uid"]}
+    )
+
+    assert parse_ndjson(response.text) == full[2:]
+
+
+@pytest.mark.asyncio
+async def test_export_after_unknown_book_is_404(db_client):
+    response = await db_client.get(
+        f"{version_prefix}/books/export", params={"after": "missing"}
+    )
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_export_gzipped_csv(db_client, db_session, monkeypatch):
+    monkeypatch.setattr(book_service_module, "EXPORT_CHUNK_SIZE", 2)
+    await seed_books(db_session, 3)
+
+    response = await db_client.get(
+        f"{version_prefix}/books/export", params={"format": "csv", "gzip": "true"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-encoding"] == "gzip"
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert rows[0]["title"]
@@ -0,0 +1,173 @@
+import json
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+
+from src import version_prefix
+from src.books import service as book_service_module
+from src.books.importer import iter_csv, iter_ndjson
+from src.books.service import BookService
+from src.db.models import Book
+
+book_service = BookService()
+
+BOOK = {
+    "title": "title",
+    "author": "author",
+    "publisher": "publisher",
+    "published_date": "2024-01-01",
+    "page_count": 100,
+    "language": "English",
+}
+
+
+async def chunked(body: bytes, size: int = 7):
+    for i in range(0, len(body), size):
+        yield body[i : i + size]
+
+
+async def collect(records):
+    return [(row, record) async for row, record in records]
+
+
+@pytest.mark.asyncio
+async def test_csv_records_span_chunks_and_lines():
+    body = (
+        "﻿title,author,publisher\r\n"
+        '"War, and Peace",Tolstoy,"Penguin\nClassics"\r\n'
+        '"She said ""hi""",Anon,Pub\n'
+        "\n"
+        "too,few\n"
+        'Last,Author,"unterminated\n'
+    ).encode()
+
+    records = await collect(iter_csv(chunked(body)))
+
+    assert records[0] == (
+        1,
+        {"title": "War, and Peace", "author": "Tolstoy", "publisher": "Penguin\nClassics"},
+    )
+    assert records[1] == (2, {"title": 'She said "hi"', "author": "Anon", "publisher": "Pub"})
+    assert [(row, str(error)) for row, error in records[2:]] == [
+        (3, "Expected 3 fields, got 2"),
+        (4, "Unterminated quoted field"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_reports_bad_lines_by_source_line():
+    body = b'\xef\xbb\xbf{"a": 1}\n\nnot json\n[1, 2]\n{"c": "\xff"}\n{"b": "\xc3\xa9"}'
+
+    records = await collect(iter_ndjson(chunked(body, 3)))
+
+    assert [(row, str(record)) for row, record in records] == [
+        (1, "{'a': 1}"),
+        (3, "Invalid JSON"),
+        (4, "Expected a JSON object"),
+        (5, "Invalid UTF-8"),
+        (6, "{'b': 'é'}"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_inserts_in_chunks(db_session, db_writer, monkeypatch):
+    monkeypatch.setattr(book_service_module, "IMPORT_CHUNK_SIZE", 4)
+    commits = []
+    submit = db_writer.submit
+
+    async def counting_submit(job):
+        commits.append(job)
+        return await submit(job)
+
+    monkeypatch.setattr(db_writer, "submit", counting_submit)
+
+    lines = [json.dumps({**BOOK, "title": f"book {i}"}) for i in range(10)]
+    lines.insert(3, json.dumps({**BOOK, "page_count": "many"}))
+    body = "\n".join(lines).encode()
+
+    report = await book_service.import_books(
+        chunked(body, 64), "application/x-ndjson; charset=utf-8", None
+    )
+
+    assert report["imported"] == 10 and report["failed"] == 1
+    assert report["errors"] == [
+        {"row": 4, "errors": ["page_count: Input should be a valid integer, unable to parse string as an integer"]}
+    ]
+    assert len(commits) == 3
+
+    count = await db_session.scalar(select(func.count()).select_from(Book))
+    assert count == 10
+
+
+@pytest.mark.asyncio
+async def test_import_endpoint_csv(db_client, db_session):
+    header = ",".join(BOOK)
+    rows = [",".join(str(v) for v in {**BOOK, "title": f"book {i}"}.values()) for i in range(3)]
+    body = "\n".join([header, *rows, "bad,row"]).encode()
+
+    response = await db_client.post(
+        f"{version_prefix}/books/import",
+        content=chunked(body),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "imported": 3,
+        "failed": 1,
+        "errors": [{"row": 4, "errors": ["Expected 6 fields, got 2"]}],
+        "errors_truncated": False,
+        "error": None,
+        "stopped_at_row": None,
+    }
+    titles = (await db_session.execute(select(Book.title).order_by(Book.title))).scalars().all()
+    assert titles == ["book 0", "book 1", "book 2"]
+
+
+@pytest.mark.asyncio
+async def test_import_rejects_other_formats(db_client):
+    response = await db_client.post(
+        f"{version_prefix}/books/import",
+        content=json.dumps([BOOK]),
+        headers={"Content-Type": "application/json"},
+    )
+
+    assert response.status_code == 415
+    assert response.json()["error_code"] == "unsupported_import_format"
+
+
+@pytest.mark.asyncio
+async def test_database_error_returns_the_partial_report(db_client, db_session, db_writer, monkeypatch):
+    monkeypatch.setattr(book_service_module, "IMPORT_CHUNK_SIZE", 4)
+    submit = db_writer.submit
+    chunks = []
+
+    async def failing_second_chunk(job):
+        chunks.append(job)
+        if len(chunks) == 2:
+            raise OperationalError("INSERT", None, Exception("disk I/O error"))
+        return await submit(job)
+
+    monkeypatch.setattr(db_writer, "submit", failing_second_chunk)
+
+    lines = [json.dumps({**BOOK, "title": f"book {i}"}) for i in range(10)]
+    lines.insert(2, "")
+    body = "\n".join(lines).encode()
+
+    response = await db_client.post(
+        f"{version_prefix}/books/import",
+        content=chunked(body, 64),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 500
+    report = response.json()
+    assert report["imported"] == 4
+    assert report["error"] == "A database error stopped the import"
+    # line 6 holds book 4, the first of the chunk that failed
+    assert report["stopped_at_row"] == 6
+    assert len(chunks) == 2
+
+    count = await db_session.scalar(select(func.count()).select_from(Book))
+    assert count == 4
@@ -0,0 +1,156 @@
+from datetime import date
+from itertools import product
+
+import pytest
+from sqlalchemy import update
+
+from src import version_prefix
+from src.books.schemas import BookListQuery
+from src.books.service import BookService
+from src.db.models import BOOK_FILTERS, Book
+from test.utils import QueryCounter, seed_books
+
+book_service = BookService()
+
+SORTS = ("created_at", "published_date", "page_count", "rating")
+FILTER_VALUES = {"author": "author 1", "language": "English", "publisher": "publisher 2"}
+
+
+async def seed_rated_books(session, count, unrated_every=None):
+    books = await seed_books(session, count)
+
+    for i, book in enumerate(books):
+        if unrated_every and i % unrated_every == 0:
+            continue
+
+        await session.execute(
+            update(Book)
+            .where(Book.uid == book.uid)
+            .values(review_count=1 + i % 3, rating_sum=1 + i % 3 + i % 5)
+        )
+    await session.commit()
+
+    for book in books:
+        await session.refresh(book)
+
+    return books
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "filter_, sort, order, date_range",
+    list(product((None, *BOOK_FILTERS), SORTS, ("asc", "desc"), (False, True))),
+)
+async def test_every_listing_walks_an_index(
+    db_engine, db_session, filter_, sort, order, date_range
+):
+    await seed_rated_books(db_session, 12, unrated_every=4)
+
+    query = BookListQuery(sort=sort, order=order)
+    if filter_:
+        setattr(query, filter_, FILTER_VALUES[filter_])
+    if date_range:
+        query.published_from, query.published_to = date(2001, 1, 1), date(2010, 1, 1)
+
+    with QueryCounter(db_engine) as counter:
+        page = await book_service.get_all_books(db_session, limit=1, query=query)
+        await book_service.get_all_books(
+            db_session, cursor=page["next_cursor"], limit=1, query=query
+        )
+
+    conn = await db_session.connection()
+
+    for statement, parameters in zip(counter.statements, counter.parameters):
+        plan = [
+            detail
+            for *_, detail in await conn.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+        ]
+
+        assert not any("TEMP B-TREE" in detail for detail in plan), plan
+        assert any("INDEX ix_books_" in detail for detail in plan), plan
+
+
+@pytest.mark.asyncio
+async def test_filtered_listing_pages_in_order(db_session):
+    books = await seed_rated_books(db_session, 30)
+
+    query = BookListQuery(
+        language="English",
+        published_from=date(2003, 1, 1),
+        sort="rating",
+        order="asc",
+    )
+
+    seen, cursor = [], None
+    while True:
+        page = await book_service.get_all_books(db_session, cursor, 4, query)
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    expected = sorted(
+        (
+            b
+            for b in books
+            if b.language == "English" and b.published_date >= date(2003, 1, 1)
+        ),
+        key=lambda b: (b.rating_avg, b.uid),
+    )
+
+    assert [b.uid for b in seen] == [b.uid for b in expected]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("order", ["asc", "desc"])
+async def test_unrated_books_list_last(db_session, order):
+    books = await seed_rated_books(db_session, 10, unrated_every=3)
+    query = BookListQuery(sort="rating", order=order)
+
+    seen, cursor = [], None
+    while True:
+        page = await book_service.get_all_books(db_session, cursor, 3, query)
+        seen.extend(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    rated = sorted(
+        (b for b in books if b.rating_avg is not None),
+        key=lambda b: (b.rating_avg, b.uid),
+        reverse=order == "desc",
+    )
+    unrated = sorted(
+        (b for b in books if b.rating_avg is None),
+        key=lambda b: b.uid,
+        reverse=order == "desc",
+    )
+
+    assert len(unrated) == 4
+    assert [b.uid for b in seen] == [b.uid for b in rated + unrated]
+
+
+@pytest.mark.asyncio
+async def test_listing_rejects_two_equality_filters(db_client):
+    response = await db_client.get(
+        f"{version_prefix}/books/",
+        params={"author": "author 1", "language": "English"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error_code"] == "unsupported_query"
+
+
+@pytest.mark.asyncio
+async def test_listing_exposes_rating_average(db_client, db_session):
+    await seed_rated_books(db_session, 3)
+
+    response = await db_client.get(
+        f"{version_prefix}/books/", params={"sort": "rating", "order": "desc"}
+    )
+
+    assert response.status_code == 200
+    ratings = [b["rating_avg"] for b in response.json()["items"]]
+    assert ratings == sorted(ratings, reverse=True) == pytest.approx([5 / 3, 1.5, 1.0])
@@ -0,0 +1,78 @@
+import pytest
+
+from src import version_prefix
+from src.books.schemas import BookUpdateModel
+from src.books.service import BookService
+from src.tags.schemas import TagAddModel, TagCreateModel
+from src.tags.service import TagService
+from test.utils import QueryCounter, seed_catalogue
+
+book_service = BookService()
+tag_service = TagService()
+
+
+@pytest.mark.asyncio
+async def test_book_etag_answers_304_before_loading(db_client, db_engine, db_session):
+    books = await seed_catalogue(db_session)
+    url = f"{version_prefix}/books/{books[0].uid}"
+
+    response = await db_client.get(url)
+    etag = response.headers["etag"]
+    assert response.status_code == 200 and response.headers["last-modified"]
+
+    with QueryCounter(db_engine) as counter:
+        response = await db_client.get(url, headers={"If-None-Match": f'W/{etag}, "other"'})
+
+    assert response.status_code == 304 and response.content == b""
+    assert response.headers["etag"] == etag
+    assert counter.count == 1
+
+    response = await db_client.get(
+        url, headers={"If-Modified-Since": response.headers["last-modified"]}
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_book_etag_changes_with_the_book_and_its_tags(db_client, db_session, db_writer):
+    books = await seed_catalogue(db_session)
+    url = f"{version_prefix}/books/{books[0].uid}"
+
+    etags = [(await db_client.get(url)).headers["etag"]]
+
+    updated = await book_service.update_book(
+        books[0].uid,
+        BookUpdateModel(
+            title="new title",
+            author=books[0].author,
+            publisher=books[0].publisher,
+            page_count=books[0].page_count,
+            language=books[0].language,
+        ),
+    )
+    assert updated.update_at > books[0].update_at
+    etags.append((await db_client.get(url)).headers["etag"])
+
+    await tag_service.add_tags_to_book(books[0].uid, TagAddModel(tags=[TagCreateModel(name="new")]))
+    response = await db_client.get(url, headers={"If-None-Match": etags[-1]})
+    assert response.status_code == 200
+    etags.append(response.headers["etag"])
+
+    assert len(set(etags)) == 3
+
+
+@pytest.mark.asyncio
+async def test_tag_list_etag_follows_renames(db_client, db_session, db_writer):
+    await seed_catalogue(db_session)
+    url = f"{version_prefix}/tags/"
+
+    response = await db_client.get(url)
+    etag = response.headers["etag"]
+    assert (await db_client.get(url, headers={"If-None-Match": etag})).status_code == 304
+
+    tag = response.json()[0]
+    renamed = await tag_service.update_tag(tag["uid"], TagCreateModel(name="renamed"))
+    assert renamed.update_at is not None
+
+    response = await db_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["etag"] != etag
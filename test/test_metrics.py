@@ -0,0 +1,85 @@
+import pytest
+from fakeredis import FakeAsyncRedis
+from prometheus_client import REGISTRY, CollectorRegistry
+from sqlalchemy import text
+
+from src import app, version_prefix
+from src.auth.dependencies import get_current_user
+from src.db.main import instrument_engine
+from src.db.redis import TimedRedis
+from src.metrics import TaskQueueCollector
+from test.utils import mock_user
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_labels_requests_by_route(db_client):
+    labels = {"method": "GET", "route": f"{version_prefix}/books/{{book_uid}}", "status": "404"}
+    before = sample("booktracker_http_request_duration_seconds_count", **labels)
+
+    await db_client.get(f"{version_prefix}/books/one")
+    await db_client.get(f"{version_prefix}/books/two")
+
+    admin = mock_user()
+    admin.role = "admin"
+    app.dependency_overrides[get_current_user] = lambda: admin
+    response = await db_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "booktracker_http_request_duration_seconds_bucket" in response.text
+    assert sample("booktracker_http_request_duration_seconds_count", **labels) == before + 2
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_is_for_admins_only(db_client):
+    response = await db_client.get("/metrics")
+
+    assert response.status_code == 401
+    assert response.json()["error_code"] == "insufficient_permissions"
+
+
+@pytest.mark.asyncio
+async def test_statements_and_redis_commands_are_timed(db_engine):
+    instrument_engine(db_engine, "test")
+
+    async with db_engine.connect() as conn:
+        await conn.execute(text("select 1"))
+
+    assert sample("booktracker_db_statement_duration_seconds_count", engine="test", operation="SELECT") == 1
+
+    before = sample("booktracker_redis_command_duration_seconds_count", command="SET")
+
+    async with FakeAsyncRedis() as fake:
+        client = TimedRedis(connection_pool=fake.connection_pool)
+        await client.set("key", "value")
+
+        async with client.pipeline() as pipe:
+            pipe.get("key")
+            assert await pipe.execute() == [b"value"]
+
+    assert sample("booktracker_redis_command_duration_seconds_count", command="SET") == before + 1
+    assert sample("booktracker_redis_command_duration_seconds_count", command="PIPELINE") >= 1
+
+
+def test_queue_depth_is_read_only_when_scraped():
+    sizes = []
+
+    class Broker:
+        def get_declared_queues(self):
+            return {"default"}
+
+        def do_qsize(self, queue_name):
+            sizes.append(queue_name)
+            return 3
+
+    # like the default REGISTRY, which calls collect() if describe() is missing
+    registry = CollectorRegistry(auto_describe=True)
+    registry.register(TaskQueueCollector(Broker()))
+
+    assert sizes == []
+    assert registry.get_sample_value("booktracker_task_queue_depth", {"queue": "default"}) == 3
+    assert sizes == ["default"]
@@ -0,0 +1,61 @@
+from datetime import date, datetime
+
+import pytest
+
+from src.books.service import BookService
+from src.db.models import Book
+from src.db.pagination import decode_cursor, encode_cursor
+from src.errors import InvalidCursor
+from test.utils import seed_books
+
+book_service = BookService()
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 10, 30, 1, 59, 4, 232047)
+
+    cursor = encode_cursor(created_at, "abc")
+
+    assert decode_cursor(cursor, (Book.created_at, Book.uid)) == (created_at, "abc")
+    assert decode_cursor(encode_cursor(date(2024, 1, 1)), (Book.published_date,)) == (
+        date(2024, 1, 1),
+    )
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("only-one-key")])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, (Book.created_at, Book.uid))
+
+
+@pytest.mark.asyncio
+async def test_get_all_books_pages_through_catalogue(db_session):
+    books = await seed_books(db_session, 25)
+
+    seen, cursor = [], None
+    while True:
+        page = await book_service.get_all_books(db_session, cursor=cursor, limit=10)
+        seen.extend(book.uid for book in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    expected = sorted(books, key=lambda b: (b.created_at, b.uid), reverse=True)
+    assert seen == [book.uid for book in expected]
+
+
+@pytest.mark.asyncio
+async def test_get_user_books_only_returns_user_books(db_session):
+    await seed_books(db_session, 5, user_uid="someone-else")
+    mine = await seed_books(db_session, 3, user_uid="me")
+
+    page = await book_service.get_user_books("me", db_session, limit=2)
+    assert len(page["items"]) == 2
+    assert page["next_cursor"] is not None
+
+    page = await book_service.get_user_books(
+        "me", db_session, cursor=page["next_cursor"], limit=2
+    )
+    assert len(page["items"]) == 1
+    assert page["next_cursor"] is None
+    assert {b.uid for b in mine} >= {b.uid for b in page["items"]}
@@ -0,0 +1,46 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import Book
+from src.profiling import SqlProfilingMiddleware, normalize_statement, profile_engine
+
+
+def test_normalize_statement_ignores_literals_and_list_lengths():
+    assert normalize_statement(
+        "SELECT * FROM books\n  WHERE page_count > 100 AND uid IN (?, ?, ?) AND title = 'x'"
+    ) == normalize_statement("SELECT * FROM books WHERE page_count > 7 AND uid IN (?) AND title = 'y'")
+
+
+@pytest.mark.asyncio
+async def test_profiling_reports_queries_and_repeated_statements(db_engine, caplog):
+    profile_engine(db_engine, slow_ms=0)
+
+    app = FastAPI()
+    app.add_middleware(SqlProfilingMiddleware, repeat_threshold=3)
+
+    @app.get("/books")
+    async def books():
+        # one query per book: the pattern the detector is for
+        async with AsyncSession(db_engine) as session:
+            for i in range(4):
+                await session.scalar(select(Book).where(Book.page_count == i))
+        return {}
+
+    with caplog.at_level(logging.WARNING, logger="booktracker.sql"):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/books")
+
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert response.headers["server-timing"].endswith('desc="4 queries"')
+
+    n_plus_one = [r for r in caplog.records if r.name == "booktracker.sql"]
+    assert len(n_plus_one) == 1
+    assert "GET /books ran the same statement 4 times" in n_plus_one[0].getMessage()
+
+    slow = [r for r in caplog.records if r.name == "booktracker.sql.slow"]
+    assert len(slow) == 4
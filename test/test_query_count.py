@@ -0,0 +1,42 @@
+import pytest
+
+from src import version_prefix
+from src.auth.service import UserService
+from test.utils import QueryCounter, seed_catalogue
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "path, expected_queries",
+    [
+        ("/books/", 1),
+        ("/books/{book_uid}", 4),
+        ("/auth/me", 3),
+        ("/tags/", 2),
+    ],
+)
+async def test_queries_per_endpoint(db_client, db_engine, db_session, path, expected_queries):
+    books = await seed_catalogue(db_session)
+
+    with QueryCounter(db_engine) as counter:
+        response = await db_client.get(
+            version_prefix + path.format(book_uid=books[0].uid),
+            headers={"Authorization": "Bearer fake.jwt"},
+        )
+
+    assert response.status_code == 200
+    assert counter.count == expected_queries, counter.statements
+
+
+@pytest.mark.asyncio
+async def test_principal_lookup_reads_one_row(db_engine, db_session):
+    await seed_catalogue(db_session)
+
+    with QueryCounter(db_engine) as counter:
+        principal = await UserService().get_principal_by_email(
+            "john.doe@example.com", db_session
+        )
+
+    assert principal.role == "user" and principal.is_verified
+    assert counter.count == 1
+    assert "password_hash" not in counter.statements[0]
@@ -0,0 +1,124 @@
+import re
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from src.auth.service import UserService
+from src.books.schemas import BookCreateModel, BookUpdateModel
+from src.books.service import BookService
+from src.db.models import Review, Tag
+from src.reviews.schemas import ReviewCreateModel
+from src.reviews.service import ReviewService
+from src.tags.schemas import TagAddModel, TagBulkAssignModel, TagCreateModel
+from src.tags.service import TagService
+from test.utils import QueryCounter, seed_catalogue
+
+book_service = BookService()
+review_service = ReviewService()
+tag_service = TagService()
+user_service = UserService()
+
+EMAIL = "john.doe@example.com"
+
+# "SCAN books" reads every row; "SCAN books USING INDEX ..." walks an index
+FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+async def book_pages(session, books):
+    page = await book_service.get_all_books(session, limit=3)
+    await book_service.get_all_books(session, cursor=page["next_cursor"], limit=3)
+    await book_service.get_user_books(books[0].user_uid, session, limit=3)
+
+
+async def book_detail(session, books):
+    await book_service.get_book_detail(books[0].uid, session)
+
+
+async def book_writes(session, books):
+    await book_service.create_book(
+        BookCreateModel(
+            title="title",
+            author="author",
+            publisher="publisher",
+            published_date=date(2024, 1, 1),
+            page_count=1,
+            language="English",
+        ),
+        books[0].user_uid,
+    )
+    await book_service.update_book(
+        books[0].uid,
+        BookUpdateModel(
+            title="title", author="author", publisher="publisher", page_count=1, language="English"
+        ),
+    )
+    await book_service.delete_book(books[1].uid)
+
+
+async def user_lookups(session, books):
+    await user_service.get_user_by_email(EMAIL, session)
+    await user_service.get_principal_by_email(EMAIL, session)
+    await user_service.get_user_profile(EMAIL, session)
+
+
+async def user_update(session, books):
+    user = await user_service.get_user_by_email(EMAIL, session)
+    await user_service.update_user(user, {"is_verified": True})
+
+
+async def reviews(session, books):
+    await review_service.get_all_reviews(session)
+    review = (
+        await session.execute(select(Review).where(Review.book_uid == books[0].uid))
+    ).scalars().first()
+    await review_service.get_review(review.uid, session)
+    await review_service.delete_review_to_from_book(review.uid, EMAIL)
+    await review_service.add_review_to_book(
+        EMAIL, review.book_uid, ReviewCreateModel(rating=3, review_text="ok")
+    )
+
+
+async def tags(session, books):
+    await tag_service.get_tags(session)
+    await tag_service.add_tags_to_book(
+        books[0].uid, TagAddModel(tags=[TagCreateModel(name="new"), TagCreateModel(name="newer")])
+    )
+    tag = (await session.execute(select(Tag).where(Tag.name == "tag 0"))).scalars().first()
+    await tag_service.get_tag_by_uid(tag.uid, session)
+    page = await tag_service.get_tag_books(tag.uid, session, limit=2)
+    await tag_service.get_tag_books(tag.uid, session, page["next_cursor"], limit=2)
+    await tag_service.add_tag(TagCreateModel(name="another"))
+    await tag_service.bulk_assign(
+        TagBulkAssignModel(book_uids=[b.uid for b in books], tags=[TagCreateModel(name="bulk")])
+    )
+    await tag_service.update_tag(tag.uid, TagCreateModel(name="renamed"))
+    await tag_service.delete_tag(tag.uid)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "scenario",
+    [book_pages, book_detail, book_writes, user_lookups, user_update, reviews, tags],
+    ids=lambda scenario: scenario.__name__,
+)
+async def test_service_statements_use_indexes(db_engine, db_session, db_writer, scenario):
+    books = await seed_catalogue(db_session)
+
+    with QueryCounter(db_engine) as counter:
+        await scenario(db_session, books)
+
+    conn = await db_session.connection()
+    scans = []
+
+    for statement, parameters in zip(counter.statements, counter.parameters):
+        if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            continue
+
+        plan = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        scans.extend(
+            (detail, statement) for *_, detail in plan if FULL_SCAN.match(detail)
+        )
+
+    assert counter.count > 0
+    assert not scans, scans
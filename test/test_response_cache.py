@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+import redis.asyncio as aioredis
+
+from src import app, version_prefix
+from src.auth.dependencies import get_current_user
+from src.books.schemas import BookCreateModel
+from src.books.service import BookService
+from src.db.models import Review
+from src.response_cache import ResponseCache
+from src.tags.schemas import TagAddModel, TagBulkAssignModel, TagCreateModel
+from src.tags.service import TagService
+from test.utils import mock_user, seed_books
+
+book_service = BookService()
+tag_service = TagService()
+
+
+def counting_build(body: bytes = b"[]", delay: float = 0):
+    calls = []
+
+    async def build():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return body
+
+    return build, calls
+
+
+@pytest.mark.asyncio
+async def test_book_listing_is_cached_until_a_book_changes(db_client, db_session):
+    await seed_books(db_session, 2)
+
+    first = await db_client.get(f"{version_prefix}/books/", params={"limit": 5})
+    second = await db_client.get(f"{version_prefix}/books/", params={"limit": 5})
+
+    assert first.headers["x-cache"] == "MISS" and second.headers["x-cache"] == "HIT"
+    assert first.json() == second.json() and len(first.json()["items"]) == 2
+
+    await book_service.create_book(
+        BookCreateModel(
+            title="new",
+            author="author",
+            publisher="publisher",
+            published_date="2024-01-01",
+            page_count=10,
+            language="English",
+        ),
+        None,
+    )
+
+    third = await db_client.get(f"{version_prefix}/books/", params={"limit": 5})
+    assert third.headers["x-cache"] == "MISS" and len(third.json()["items"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_served_while_one_refresh_runs(redis_client):
+    cache = ResponseCache(redis_client, ttl=0, stale_ttl=60)
+    build, calls = counting_build(delay=0.05)
+
+    assert (await cache.get_or_build("page", [], ("books",), build))[1] == "MISS"
+
+    states = await asyncio.gather(
+        *(cache.get_or_build("page", [], ("books",), build) for _ in range(5))
+    )
+    await asyncio.gather(*cache._refreshing)
+
+    assert [state for _, state in states] == ["STALE"] * 5
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_a_build_is_not_lost(redis_client):
+    cache = ResponseCache(redis_client, ttl=60, stale_ttl=60)
+
+    async def racing_build():
+        await cache.invalidate("books")
+        return b"old"
+
+    await cache.get_or_build("page", [], ("books",), racing_build)
+    build, _ = counting_build(b"new")
+
+    assert await cache.get_or_build("page", [], ("books",), build) == (b"new", "MISS")
+    assert await cache.get_or_build("page", [], ("books",), build) == (b"new", "HIT")
+
+
+@pytest.mark.asyncio
+async def test_unreachable_redis_bypasses_the_cache():
+    redis = aioredis.Redis(port=1, socket_connect_timeout=0.1)
+    cache = ResponseCache(redis)
+    build, calls = counting_build()
+
+    assert await cache.get_or_build("page", [], ("books",), build) == (b"[]", "BYPASS")
+    await cache.invalidate("books")
+    assert len(calls) == 1
+
+    await redis.aclose()
+
+
+async def cached_page(client, path):
+    response = await client.get(f"{version_prefix}{path}")
+    assert (await client.get(f"{version_prefix}{path}")).headers["x-cache"] == "HIT"
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_book_refreshes_cached_reviews(db_client, db_session):
+    admin = mock_user()
+    admin.role = "admin"
+    app.dependency_overrides[get_current_user] = lambda: admin
+
+    [book] = await seed_books(db_session, 1)
+    db_session.add(Review(rating=4, review_text="good", book_uid=book.uid))
+    await db_session.commit()
+
+    [review] = await cached_page(db_client, "/reviews/")
+    assert review["book_uid"] == book.uid
+
+    await book_service.delete_book(book.uid)
+
+    response = await db_client.get(f"{version_prefix}/reviews/")
+    assert response.headers["x-cache"] == "MISS"
+    assert response.json()[0]["book_uid"] is None
+
+
+async def add_tag(book, tag):
+    await tag_service.add_tags_to_book(book.uid, TagAddModel(tags=[TagCreateModel(name="new")]))
+
+
+async def bulk_assign(book, tag):
+    await tag_service.bulk_assign(
+        TagBulkAssignModel(book_uids=[book.uid], tags=[TagCreateModel(name="new")])
+    )
+
+
+async def rename_tag(book, tag):
+    await tag_service.update_tag(tag.uid, TagCreateModel(name="renamed"))
+
+
+async def delete_tag(book, tag):
+    await tag_service.delete_tag(tag.uid)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mutate", [add_tag, bulk_assign, rename_tag, delete_tag])
+async def test_tag_changes_refresh_cached_books(db_client, db_session, mutate):
+    [book] = await seed_books(db_session, 1)
+    tag = await tag_service.add_tag(TagCreateModel(name="old"))
+    await tag_service.add_tags_to_book(book.uid, TagAddModel(tags=[TagCreateModel(name="old")]))
+
+    [before] = (await cached_page(db_client, "/books/"))["items"]
+
+    await mutate(book, tag)
+
+    response = await db_client.get(f"{version_prefix}/books/")
+    assert response.headers["x-cache"] == "MISS"
+    assert response.json()["items"][0]["update_at"] != before["update_at"]
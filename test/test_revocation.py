@@ -0,0 +1,94 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from src.auth.revocation import RevokedTokenCache
+from src.db.redis import REVOKED_JTI_SET, revoke_access_jti, rotate_refresh_id
+
+
+async def wait_until_synced(cache):
+    for _ in range(100):
+        if cache.synced:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("revocation cache never subscribed")
+
+
+@pytest.fixture
+def fake_token_logout(redis_client):
+    with patch("src.db.redis.token_logout", redis_client):
+        yield redis_client
+
+
+@pytest.mark.asyncio
+async def test_revocations_are_answered_locally(fake_token_logout):
+    # Given a token revoked before the cache subscribed
+    await revoke_access_jti("revoked-early", 600)
+
+    cache = RevokedTokenCache(maxsize=10, ttl=600)
+    await cache.start()
+    await wait_until_synced(cache)
+
+    # And one revoked afterwards on another worker
+    await revoke_access_jti("revoked-late", 600)
+    await asyncio.sleep(0.05)
+
+    try:
+        with patch("src.auth.revocation.token_in_logout", AsyncMock()) as lookup:
+            assert await cache.is_revoked("revoked-early")
+            assert await cache.is_revoked("revoked-late")
+            assert not await cache.is_revoked("still-valid")
+
+        lookup.assert_not_awaited()
+    finally:
+        await cache.stop()
+
+
+@pytest.mark.asyncio
+async def test_eviction_falls_back_to_redis(fake_token_logout):
+    cache = RevokedTokenCache(maxsize=1, ttl=600)
+    cache.synced = True
+
+    await revoke_access_jti("first", 600)
+    cache.add("first")
+    cache.add("second")
+
+    assert await cache.is_revoked("first")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fail_open", [True, False])
+async def test_unreachable_redis_follows_fail_mode(fail_open):
+    cache = RevokedTokenCache(maxsize=10, ttl=600, fail_open=fail_open)
+
+    with patch(
+        "src.auth.revocation.token_in_logout", AsyncMock(side_effect=ConnectionError())
+    ):
+        assert await cache.is_revoked("unknown") is not fail_open
+
+
+@pytest.mark.asyncio
+async def test_refresh_id_rotation_is_atomic(fake_token_logout):
+    await fake_token_logout.set("old-refresh-id", "john.doe@example.com")
+
+    owners = await asyncio.gather(
+        rotate_refresh_id("old-refresh-id", "new-refresh-id-1"),
+        rotate_refresh_id("old-refresh-id", "new-refresh-id-2"),
+    )
+
+    assert set(owners) == {"john.doe@example.com", None}
+    assert await fake_token_logout.exists("old-refresh-id") == 0
+    assert await fake_token_logout.exists("new-refresh-id-1", "new-refresh-id-2") == 1
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_refresh_id_and_access_jti(fake_token_logout):
+    await fake_token_logout.set("refresh-id", "john.doe@example.com")
+
+    await revoke_access_jti("access-jti", 600, "refresh-id")
+
+    assert await fake_token_logout.exists("refresh-id") == 0
+    assert await fake_token_logout.get("access-jti") == b"Invalid"
+    assert await fake_token_logout.zscore(REVOKED_JTI_SET, "access-jti") is not None
@@ -0,0 +1,91 @@
+from datetime import date
+
+import pytest
+
+from src import version_prefix
+from src.books.schemas import BookUpdateModel
+from src.books.service import BookService
+from src.db.fts import match_query
+from src.db.models import Book
+from test.utils import seed_books
+
+book_service = BookService()
+
+
+def new_book(title, author="author", publisher="publisher"):
+    return Book(
+        title=title,
+        author=author,
+        publisher=publisher,
+        published_date=date(2024, 1, 1),
+        page_count=100,
+        language="English",
+    )
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("war and peace", '"war" "and" "peace"*'),
+        ('tolstoy" OR title:*', '"tolstoy" "OR" "title"*'),
+        ("  -*() ", ""),
+    ],
+)
+def test_match_query(text, expected):
+    assert match_query(text) == expected
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_and_pages(db_session):
+    await seed_books(db_session, 20)
+    db_session.add_all(
+        [
+            new_book("Peace of mind", publisher="Dune"),
+            new_book("Dune", author="Frank Herbert"),
+            new_book("Dune Messiah", author="Frank Herbert"),
+        ]
+    )
+    await db_session.commit()
+
+    page = await book_service.search_books("dune", db_session, limit=2)
+    titles = [book.title for book in page["items"]]
+
+    # title matches outrank the publisher match
+    assert titles == ["Dune", "Dune Messiah"]
+
+    page = await book_service.search_books("dune", db_session, page["next_cursor"], 2)
+    assert [book.title for book in page["items"]] == ["Peace of mind"]
+    assert page["next_cursor"] is None
+
+    page = await book_service.search_books("herb", db_session)
+    assert len(page["items"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_search_follows_writes(db_client, db_session):
+    book = new_book("Old title")
+    db_session.add(book)
+    await db_session.commit()
+
+    await book_service.update_book(
+        book.uid,
+        BookUpdateModel(
+            title="Brand new title",
+            author="author",
+            publisher="publisher",
+            page_count=1,
+            language="English",
+        ),
+    )
+
+    response = await db_client.get(
+        f"{version_prefix}/books/search", params={"q": "brand new"}
+    )
+    assert response.status_code == 200
+    assert [b["uid"] for b in response.json()["items"]] == [book.uid]
+    assert (await book_service.search_books("old", db_session))["items"] == []
+
+    await book_service.delete_book(book.uid)
+
+    response = await db_client.get(f"{version_prefix}/books/search", params={"q": "brand"})
+    assert response.json() == {"items": [], "next_cursor": None}
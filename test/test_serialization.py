@@ -0,0 +1,30 @@
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from src.books.schemas import BookDetailModel, BookPage
+from src.books.service import BookService
+from src.serialization import adapter_for, dump_json
+from test.utils import seed_catalogue
+
+book_service = BookService()
+
+
+async def fastapi_body(model_type, value) -> bytes:
+    field = create_model_field(name="Response", type_=model_type, mode="serialization")
+
+    return JSONResponse(await serialize_response(field=field, response_content=value)).body
+
+
+@pytest.mark.asyncio
+async def test_fast_path_matches_fastapi_byte_for_byte(db_session):
+    books = await seed_catalogue(db_session)
+
+    detail = await book_service.get_book_detail(books[0].uid, db_session)
+    page = await book_service.get_all_books(db_session, None, 5, None)
+
+    assert detail.reviews and detail.tags
+    assert dump_json(BookDetailModel, detail) == await fastapi_body(BookDetailModel, detail)
+    assert dump_json(BookPage, page) == await fastapi_body(BookPage, page)
+    assert adapter_for(BookPage) is adapter_for(BookPage)
@@ -0,0 +1,144 @@
+import asyncio
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from src import version_prefix
+from src.db.models import Book, BookTag, Tag
+from src.errors import TagAlreadyExists
+from src.tags import service as tag_service_module
+from src.tags.schemas import TagAddModel, TagBulkAssignModel, TagCreateModel
+from src.tags.service import TagService
+from test.utils import QueryCounter, seed_books, seed_catalogue
+
+tag_service = TagService()
+
+
+def tag_data(*names):
+    return TagAddModel(tags=[TagCreateModel(name=name) for name in names])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [1, 50])
+async def test_tagging_runs_a_constant_number_of_statements(db_engine, db_session, db_writer, count):
+    [book] = await seed_books(db_session, 1)
+    names = [f"tag {i}" for i in range(count)]
+
+    with QueryCounter(db_engine) as counter:
+        tagged = await tag_service.add_tags_to_book(book.uid, tag_data(*names, *names))
+
+    statements = [s for s in counter.statements if not s.startswith(("SAVEPOINT", "RELEASE"))]
+    assert len(statements) == 4, statements
+
+    linked = await db_session.scalars(
+        select(Tag.name).join(BookTag, BookTag.tag_id == Tag.uid).where(BookTag.book_id == book.uid)
+    )
+    assert sorted(linked) == sorted(names)
+
+    # the response carries the validators the link trigger just wrote
+    version, update_at = (
+        await db_session.execute(select(Book.version, Book.update_at).where(Book.uid == book.uid))
+    ).one()
+    assert (tagged.version, tagged.update_at) == (version, update_at)
+    assert version > book.version
+
+
+@pytest.mark.asyncio
+async def test_tagging_reuses_existing_tags_and_links(db_session, db_writer):
+    first, second = await seed_books(db_session, 2)
+
+    await tag_service.add_tags_to_book(first.uid, tag_data("a", "b"))
+    await asyncio.gather(
+        tag_service.add_tags_to_book(first.uid, tag_data("b", "c")),
+        tag_service.add_tags_to_book(second.uid, tag_data("a", "c")),
+    )
+
+    tags = await db_session.scalar(select(func.count()).select_from(Tag))
+    links = await db_session.scalar(select(func.count()).select_from(BookTag))
+    assert (tags, links) == (3, 5)
+
+
+@pytest.mark.asyncio
+async def test_renaming_onto_an_existing_name_is_rejected(db_session, db_writer):
+    a = await tag_service.add_tag(TagCreateModel(name="a"))
+    await tag_service.add_tag(TagCreateModel(name="b"))
+
+    with pytest.raises(TagAlreadyExists):
+        await tag_service.update_tag(a.uid, TagCreateModel(name="b"))
+
+    names = (await db_session.execute(select(Tag.name).order_by(Tag.name))).scalars().all()
+    assert names == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_assign_counts_links_and_keeps_a_query_budget(
+    db_engine, db_session, db_writer, monkeypatch
+):
+    monkeypatch.setattr(tag_service_module, "BULK_ASSIGN_CHUNK_SIZE", 2)
+    books = await seed_books(db_session, 5)
+    await tag_service.add_tags_to_book(books[0].uid, tag_data("a"))
+
+    assign = TagBulkAssignModel(
+        book_uids=[b.uid for b in books] + ["missing", books[1].uid],
+        tags=[TagCreateModel(name="a"), TagCreateModel(name="b")],
+    )
+
+    with QueryCounter(db_engine) as counter:
+        report = await tag_service.bulk_assign(assign)
+
+    assert report == {"created": 9, "skipped": 1, "missing_books": 1}
+    # one tag upsert, then an insert and a count for each of 3 chunks
+    assert len(counter.statements) == 1 + 2 * 3, counter.statements
+
+    links = await db_session.scalar(select(func.count()).select_from(BookTag))
+    assert links == 10
+
+
+@pytest.mark.asyncio
+async def test_bulk_assign_endpoint(db_client, db_session):
+    books = await seed_books(db_session, 2)
+
+    response = await db_client.post(
+        f"{version_prefix}/tags/bulk-assign",
+        json={"book_uids": [b.uid for b in books], "tags": [{"name": "classic"}]},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"created": 2, "skipped": 0, "missing_books": 0}
+
+
+@pytest.mark.asyncio
+async def test_book_counts_follow_booktag_changes(db_session, db_writer):
+    books = await seed_books(db_session, 3)
+
+    await tag_service.add_tags_to_book(books[0].uid, tag_data("a", "b"))
+    await tag_service.bulk_assign(
+        TagBulkAssignModel(book_uids=[b.uid for b in books], tags=[TagCreateModel(name="a")])
+    )
+    await db_session.execute(delete(BookTag).where(BookTag.book_id == books[2].uid))
+    await db_session.commit()
+
+    tags = await tag_service.get_tags(db_session)
+    assert sorted((t.name, t.book_count) for t in tags) == [("a", 2), ("b", 1)]
+
+
+@pytest.mark.asyncio
+async def test_tag_books_endpoint_pages_through_tagged_books(db_client, db_session):
+    books = await seed_catalogue(db_session)
+    tag = (await db_session.execute(select(Tag).where(Tag.name == "tag 0"))).scalars().one()
+
+    uids, cursor = [], None
+    while True:
+        params = {"limit": 4, **({"cursor": cursor} if cursor else {})}
+        response = await db_client.get(f"{version_prefix}/tags/{tag.uid}/books", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        uids += [book["uid"] for book in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert uids == sorted(b.uid for b in books)
+
+    response = await db_client.get(f"{version_prefix}/tags/missing/books")
+    assert response.status_code == 404
@@ -0,0 +1,297 @@
+import asyncio
+from datetime import date
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel
+
+from src.books.schemas import BookCreateModel
+from src.books.service import BookService
+from src.config import Config
+from src.db.main import build_engine
+from src.db.models import Book
+from src.db.writer import WriteQueue
+
+book_service = BookService()
+
+
+def book_data(i: int) -> BookCreateModel:
+    return BookCreateModel(
+        title=f"title {i}",
+        author="author",
+        publisher="publisher",
+        published_date=date(2024, 1, 1),
+        page_count=100,
+        language="English",
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_are_serialized(db_engine, db_writer):
+    books = await asyncio.gather(
+        *(book_service.create_book(book_data(i), None) for i in range(50))
+    )
+
+    assert len({book.uid for book in books}) == 50
+
+    async with async_sessionmaker(db_engine)() as session:
+        count = await session.scalar(select(func.count()).select_from(Book))
+
+    assert count == 50
+
+
+@pytest.mark.asyncio
+async def test_failed_job_rolls_back_and_queue_continues(db_engine):
+    queue = WriteQueue(async_sessionmaker(db_engine, expire_on_commit=False))
+
+    async def fail(session):
+        session.add(Book(**book_data(0).model_dump()))
+        raise ValueError("boom")
+
+    async def add(session):
+        session.add(Book(**book_data(1).model_dump()))
+
+    with pytest.raises(ValueError):
+        await queue.submit(fail)
+    await queue.submit(add)
+    await queue.close()
+
+    async with async_sessionmaker(db_engine)() as session:
+        titles = (await session.execute(select(Book.title))).scalars().all()
+
+    assert titles == ["title 1"]
+
+
+@pytest_asyncio.fixture
+async def file_engines(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path}/group.db"
+    writer = build_engine(url, Config)
+    reader = build_engine(url, Config, read_only=True)
+
+    async with writer.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    yield writer, reader
+
+    await reader.dispose()
+    await writer.dispose()
+
+
+async def count_books(engine) -> int:
+    async with engine.connect() as conn:
+        return await conn.scalar(select(func.count()).select_from(Book))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("group_commit", [False, True])
+async def test_cancelled_job_fails_alone(db_engine, group_commit):
+    queue = WriteQueue(
+        async_sessionmaker(db_engine, expire_on_commit=False),
+        group_commit=group_commit,
+    )
+
+    async def cancelled(session):
+        raise asyncio.CancelledError()
+
+    async def add(session):
+        session.add(Book(**book_data(1).model_dump()))
+        return "added"
+
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            queue.submit(cancelled), queue.submit(add), queue.submit(add),
+            return_exceptions=True,
+        ),
+        timeout=5,
+    )
+    await queue.close()
+
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert results[1:] == ["added", "added"]
+
+
+class WorkerKilled(BaseException):
+    pass
+
+
+@pytest.mark.asyncio
+async def test_worker_death_fails_queued_jobs(db_engine):
+    queue = WriteQueue(async_sessionmaker(db_engine, expire_on_commit=False))
+
+    async def kill_worker(session):
+        raise WorkerKilled()
+
+    async def add(session):
+        return "added"
+
+    submissions = [
+        asyncio.ensure_future(queue.submit(job)) for job in (kill_worker, add, add)
+    ]
+    await asyncio.sleep(0)
+
+    with pytest.raises(WorkerKilled):
+        await queue._worker
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*submissions, return_exceptions=True), timeout=5
+    )
+
+    assert isinstance(results[0], WorkerKilled)
+    assert [str(error) for error in results[1:]] == ["Write queue closed"] * 2
+    assert await queue.submit(add) == "added"
+    await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_group_commit_merges_jobs_into_one_transaction(file_engines):
+    writer, reader = file_engines
+    queue = WriteQueue(
+        async_sessionmaker(writer, expire_on_commit=False),
+        group_commit=True,
+        batch_window=0.05,
+    )
+
+    def add(i):
+        async def job(session):
+            if i == 3:
+                session.add(Book(**book_data(i).model_dump()))
+                raise ValueError("boom")
+
+            book = Book(**book_data(i).model_dump())
+            session.add(book)
+            await session.flush()
+            return book
+
+        return job
+
+    async def visible(session):
+        # runs after the other jobs' savepoints were released
+        return await count_books(reader)
+
+    results = await asyncio.gather(
+        *(queue.submit(add(i)) for i in range(10)), queue.submit(visible),
+        return_exceptions=True,
+    )
+    await queue.close()
+
+    assert isinstance(results[3], ValueError)
+    assert [book.title for book in results[:10] if isinstance(book, Book)] == [
+        f"title {i}" for i in range(10) if i != 3
+    ]
+    assert results[10] == 0
+
+    async with async_sessionmaker(reader)() as session:
+        titles = (await session.execute(select(Book.title))).scalars().all()
+
+    assert sorted(titles) == sorted(f"title {i}" for i in range(10) if i != 3)
+
+
+@pytest.mark.asyncio
+async def test_failed_group_commit_writes_nothing(file_engines):
+    writer, reader = file_engines
+
+    class FailingCommitSession(AsyncSession):
+        async def commit(self):
+            raise OperationalError("COMMIT", None, Exception("disk I/O error"))
+
+    queue = WriteQueue(
+        async_sessionmaker(writer, class_=FailingCommitSession, expire_on_commit=False),
+        group_commit=True,
+        batch_window=0.05,
+    )
+
+    async def add(session):
+        session.add(Book(**book_data(0).model_dump()))
+        await session.flush()
+
+    results = await asyncio.gather(
+        *(queue.submit(add) for _ in range(5)), return_exceptions=True
+    )
+    await queue.close()
+
+    assert all(isinstance(result, OperationalError) for result in results)
+    assert await count_books(reader) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_savepoint_keeps_earlier_results(file_engines):
+    writer, _ = file_engines
+    queue = WriteQueue(
+        async_sessionmaker(writer, expire_on_commit=False),
+        group_commit=True,
+        batch_window=0.05,
+    )
+    created = asyncio.get_running_loop().create_future()
+
+    async def add(session):
+        book = Book(**book_data(0).model_dump())
+        session.add(book)
+        await session.flush()
+        created.set_result(book.uid)
+        return book
+
+    async def rename_and_fail(session):
+        book = await session.get(Book, await created)
+        book.title = "renamed"
+        await session.flush()
+        raise ValueError("boom")
+
+    book, error = await asyncio.gather(
+        queue.submit(add), queue.submit(rename_and_fail), return_exceptions=True
+    )
+    await queue.close()
+
+    assert isinstance(error, ValueError)
+    assert book.__dict__["title"] == "title 0"
+
+
+@pytest.mark.asyncio
+async def test_writers_in_two_processes_do_not_fail_on_stale_snapshots(tmp_path):
+    # two writer engines on one file stand in for two server workers
+    url = f"sqlite+aiosqlite:///{tmp_path}/workers.db"
+    first, second = build_engine(url, Config), build_engine(url, Config)
+
+    async with first.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async def insert(engine, i):
+        async with async_sessionmaker(engine)() as session:
+            session.add(Book(**book_data(i).model_dump()))
+            await session.commit()
+
+    async with async_sessionmaker(first)() as session:
+        # read, let the other worker commit, then write
+        await session.scalar(select(func.count()).select_from(Book))
+        other = asyncio.create_task(insert(second, 1))
+        await asyncio.sleep(0.1)
+        session.add(Book(**book_data(0).model_dump()))
+        await session.commit()
+
+    await other
+
+    assert await count_books(first) == 2
+
+    await second.dispose()
+    await first.dispose()
+
+
+@pytest.mark.asyncio
+async def test_read_engine_rejects_writes(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path}/read.db"
+    writer = build_engine(url, Config)
+    reader = build_engine(url, Config, read_only=True)
+
+    async with writer.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with async_sessionmaker(reader)() as session:
+        session.add(Book(**book_data(0).model_dump()))
+
+        with pytest.raises(OperationalError, match="readonly"):
+            await session.commit()
+
+    await reader.dispose()
+    await writer.dispose()
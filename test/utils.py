@@ -36,6 +36,14 @@ def mock_book():
         description="sample description",
         page_count=200,
         language="English",
+        review_count=0,
+        rating_sum=0,
+        rating_1=0,
+        rating_2=0,
+        rating_3=0,
+        rating_4=0,
+        rating_5=0,
+        rating_avg=0.0,
         created_at=datetime.now(),
         update_at=datetime.now()
     )
@@ -58,3 +66,83 @@ def mock_token():
     token["exp"] = (datetime.now(timezone.utc) + timedelta(seconds=3600)).timestamp()
     token["jti"] = str(uuid.uuid4())
     return token
+
+
+async def seed_books(session, count, user_uid=None, start=None):
+    from src.db.models import Book
+
+    start = start or datetime(2024, 1, 1)
+    books = [
+        Book(
+            title=f"title {i}",
+            author=f"author {i % 7}",
+            publisher=f"publisher {i % 3}",
+            published_date=date(2000 + i % 20, 1, 1),
+            page_count=100 + i,
+            language="English" if i % 2 else "Japanese",
+            user_uid=user_uid,
+            # every other pair of books shares a timestamp to exercise the uid tie-break
+            created_at=start + timedelta(seconds=i // 2),
+            update_at=start + timedelta(seconds=i // 2),
+        )
+        for i in range(count)
+    ]
+    session.add_all(books)
+    await session.commit()
+    return books
+
+
+async def seed_catalogue(session):
+    from src.db.models import BookTag, Review, Tag, User
+
+    user = User(
+        username="john_doe",
+        email="john.doe@example.com",
+        first_name="John",
+        last_name="Doe",
+        is_verified=True,
+        role="user",
+        password_hash="x",
+    )
+    session.add(user)
+    await session.commit()
+
+    books = await seed_books(session, 10, user_uid=user.uid)
+    tags = [Tag(name=f"tag {i}") for i in range(3)]
+    session.add_all(tags)
+    await session.commit()
+
+    for book in books:
+        session.add(Review(rating=4, review_text="good", user_uid=user.uid, book_uid=book.uid))
+        session.add_all(BookTag(book_id=book.uid, tag_id=tag.uid) for tag in tags)
+    await session.commit()
+
+    return books
+
+
+class QueryCounter:
+    """Collects every statement an engine sends to the database"""
+
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.statements = []
+        self.parameters = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters[0] if executemany else parameters)
+
+    def __enter__(self):
+        from sqlalchemy import event
+
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        from sqlalchemy import event
+
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self):
+        return len(self.statements)